@@ -3,72 +3,197 @@
 
 import os
 import io
+import re
 import json
 from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 
+# orjson (optional) für schnelles JSON-Lesen/-Schreiben
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# pyarrow kommt mit Streamlit; CSV-Export in C, sonst pandas
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except Exception:
+    pa = None
+
 LOCAL_JSON_PATH = os.getenv("LOCAL_JSON_PATH", "data/latest.json")
 RAW_DATA_URL    = os.getenv("RAW_DATA_URL", "").strip()
 PAGE_TITLE      = os.getenv("PAGE_TITLE", "EU/DE E-Commerce Agent — Pernod Ricard")
 
+# github.com/<owner>/<repo>/blob/<ref>/<pfad> liefert HTML -> auf raw.githubusercontent umschreiben
+_m = re.match(r"https?://github\.com/([^/]+/[^/]+)/(?:blob|raw)/(.+)$", RAW_DATA_URL)
+if _m:
+    RAW_DATA_URL = f"https://raw.githubusercontent.com/{_m.group(1)}/{_m.group(2)}"
+
 st.set_page_config(page_title=PAGE_TITLE, layout="wide")
 
+# LinkColumn gibt es erst in neueren Streamlit-Versionen -> einmal beim Import prüfen
+HAS_LINKCOL = hasattr(getattr(st, "column_config", None), "LinkColumn")
+# st.fragment (ab 1.37, davor experimental_fragment); sonst normaler Durchlauf
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
 # ------------------------------ Utils ------------------------------
-def load_json() -> dict:
+@st.cache_resource(show_spinner=False)
+def _http() -> requests.Session:
+    # eine Session pro Prozess -> TCP/TLS-Verbindung wird über Reruns wiederverwendet
+    s = requests.Session()
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                    max_retries=Retry(total=2, backoff_factor=0.3)))
+    s.headers["Accept-Encoding"] = "gzip, deflate"
+    return s
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+@st.cache_resource(show_spinner=False)
+def _remote_state() -> dict:
+    # ETag/Last-Modified + zuletzt geladene Daten für Conditional GETs (prozessweit)
+    return {}
+
+def fetch_remote_json(url: str) -> dict:
+    # unverändert -> 304 ohne Body, kein erneutes Parsen
+    state = _remote_state()
+    headers = {}
+    if "data" in state:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+    r = _http().get(url, timeout=(3.05, 15), headers=headers)
+    if r.status_code == 304 and "data" in state:
+        return state["data"]
+    r.raise_for_status()
+    data = _loads(r.content)  # Bytes direkt, ohne str-Decode von r.json()
+    state.update(etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"), data=data)
+    return data
+
+def _json_mtime() -> float:
+    return os.path.getmtime(LOCAL_JSON_PATH) if os.path.exists(LOCAL_JSON_PATH) else 0.0
+
+# cache_resource statt cache_data: kein Pickle/Deep-Copy pro Rerun. Rückgaben werden
+# zwischen Sessions geteilt und dürfen nicht verändert werden (nur lesen/slicen).
+@st.cache_resource(ttl=300, show_spinner=False)
+def load_json(mtime: float = 0.0) -> dict:
+    # mtime ist nur Cache-Key: ändert sich die Datei, wird neu gelesen
     if os.path.exists(LOCAL_JSON_PATH):
         try:
-            with open(LOCAL_JSON_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(LOCAL_JSON_PATH, "rb") as f:
+                raw = f.read()
+            return _loads(raw)
         except Exception as e:
             st.error(f"Konnte '{LOCAL_JSON_PATH}' nicht lesen: {e}")
     if RAW_DATA_URL:
         try:
-            r = requests.get(RAW_DATA_URL, timeout=20)
-            r.raise_for_status()
-            return r.json()
+            return fetch_remote_json(RAW_DATA_URL)
         except Exception as e:
             st.error(f"RAW_DATA_URL fehlgeschlagen: {e}")
     st.error("Keine Daten gefunden. Prüfe data/latest.json oder setze RAW_DATA_URL.")
     st.stop()
 
 def parse_dt(s: str):
+    # fromisoformat ist C-implementiert; "Z" -> +00:00 (vor 3.11 nötig), naive Zeiten gelten als UTC
     try:
-        return datetime.strptime(s, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        dt = datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith("Z") else s)
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
     except Exception:
         return None
 
-def flatten_signals(signals: list[dict]) -> pd.DataFrame:
-    rows=[]
-    for idx,s in enumerate(signals or []):
-        t=s.get("type")
-        c=s.get("confidence")
-        v=s.get("value") or {}
-        rows.append({
-            "idx": idx,
-            "type": t,
-            "confidence": c,
-            "headline": v.get("headline"),
-            "metric": v.get("metric"),
-            "value": v.get("value"),
-            "unit": v.get("unit"),
-            "topic": v.get("topic"),
-            "summary": v.get("summary"),
-            "note": v.get("note"),
-            "period": v.get("period"),
-            "region": v.get("region"),
-        })
-    df=pd.DataFrame(rows)
+# Felder aus signal["value"], die als eigene Spalten angezeigt werden
+SIGNAL_VALUE_FIELDS = ["headline","metric","value","unit","topic","summary","note","period","region"]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def flatten_signals(_signals: list[dict], version: str) -> pd.DataFrame:
+    # _signals wird nicht gehasht; version (mtime|generated_at) ist der Cache-Key.
+    # json_normalize flacht value.* in C ab (value.headline -> value_headline)
+    df = pd.json_normalize(_signals or [], sep="_")
+    cols = {"type": "type", "confidence": "confidence"}
+    cols.update({f"value_{k}": k for k in SIGNAL_VALUE_FIELDS})
+    df = df.reindex(columns=list(cols)).rename(columns=cols)
+    df.insert(0, "idx", np.arange(len(df)))
     if not df.empty:
         df["confidence"]=pd.to_numeric(df["confidence"], errors="coerce")
+        # wenige Typen -> Categorical: isin/sort laufen über Int-Codes
+        df["type"] = df["type"].astype("category")
+        # einmal stabil sortieren; Filter-Masken erhalten die Reihenfolge -> kein Sort pro Rerun
+        df = df.sort_values(by=["confidence","type"], ascending=[False,True],
+                            kind="mergesort", ignore_index=True)
+    df["_search_blob"] = search_blob(df, ["headline","topic","summary"])
+    return arrow_strings(df)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def sources_frame(_sources: list[dict], version: str) -> tuple[pd.DataFrame, pd.Series, np.ndarray]:
+    # ein DataFrame für alle Quellen; LinkedIn-Ansicht und KPI nutzen die Maske
+    df = arrow_frame(_sources) if _sources else pd.DataFrame(columns=["title","url","source"])
+    is_li = (df["url"].fillna("").astype(str).str.contains("linkedin.com", regex=False)
+             | df["source"].fillna("").astype(str).str.startswith("linkedin"))
+    return df, search_blob(df, ["title","url","source"]), _bool(is_li)
+
+def arrow_table(rows: list[dict]):
+    # list[dict] -> pa.Table; None ohne pyarrow oder bei gemischten Typen in einer Spalte
+    if pa is None:
+        return None
+    try:
+        return pa.Table.from_pylist(rows)
+    except pa.ArrowException:
+        return None
+
+def arrow_frame(rows: list[dict]) -> pd.DataFrame:
+    # mit ArrowDtype zu pandas (keine object-Spalten dazwischen)
+    tbl = arrow_table(rows)
+    if tbl is not None:
+        return tbl.to_pandas(types_mapper=pd.ArrowDtype)
+    return arrow_strings(pd.DataFrame(rows))
+
+def arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    # object-Spalten -> string[pyarrow]: str.lower/contains laufen in Arrow-Kernels
+    if pa is None:
+        return df
+    str_cols = df.columns[(df.dtypes == object).to_numpy()]
+    if len(str_cols):
+        df[str_cols] = df[str_cols].astype("string[pyarrow]")
     return df
 
+def search_blob(df: pd.DataFrame, cols: list[str]) -> pd.Series:
+    # eine kleingeschriebene Suchspalte statt je Spalte lower()+contains()
+    blob = df[cols[0]].fillna("").astype(str)
+    for c in cols[1:]:
+        blob = blob + "\x1f" + df[c].fillna("").astype(str)
+    return blob.str.lower()
+
+# Download-Bytes werden pro Inhalt gecacht (Streamlit hasht den DataFrame),
+# sonst würde jeder Rerun CSV/JSON neu serialisieren, auch ohne Klick
+@st.cache_data(show_spinner=False, max_entries=32)
 def to_csv_bytes(df: pd.DataFrame) -> bytes:
-    buf=io.StringIO(); df.to_csv(buf, index=False); return buf.getvalue().encode("utf-8")
-def to_json_bytes(obj) -> bytes:
+    if pa is not None:
+        try:
+            buf = io.BytesIO()
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+            return buf.getvalue()
+        except pa.ArrowException:
+            pass  # z. B. gemischte Typen in einer Spalte
+    return df.to_csv(index=False).encode("utf-8")
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def to_json_bytes(df: pd.DataFrame) -> bytes:
+    obj = df.to_dict(orient="records")
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
     return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
 
+def show_table(df) -> None:
+    kw = {"column_config": {"url": st.column_config.LinkColumn("url")}} if HAS_LINKCOL else {}
+    st.dataframe(df, use_container_width=True, hide_index=True, **kw)
+
 def is_eu_url(url: str) -> bool:
     EU_TLDS = (".de",".at",".ch",".fr",".it",".es",".nl",".se",".pl",".dk",".no",".fi",".ie",".uk",".eu")
     try:
@@ -78,17 +203,27 @@ def is_eu_url(url: str) -> bool:
     except Exception:
         return False
 
-def is_ecom_row(row) -> bool:
-    txt = " ".join([str(row.get(k,"") or "") for k in ("headline","topic","summary")]).lower()
-    keys = [
-        "e-commerce","ecommerce","onlinehandel","marktplatz","marketplace",
-        "retail media","amazon","zalando","d2c","online sales","digital commerce",
-        "buy box","gmv","cart","checkout","conversion"
-    ]
-    return any(k in txt for k in keys) or (str(row.get("type","")).lower() in ("ecommerce","retail_media"))
+ECOM_KEYS = [
+    "e-commerce","ecommerce","onlinehandel","marktplatz","marketplace",
+    "retail media","amazon","zalando","d2c","online sales","digital commerce",
+    "buy box","gmv","cart","checkout","conversion"
+]
+ECOM_RE = re.compile("|".join(map(re.escape, ECOM_KEYS)))
+EU_REGIONS = ["EU","DE","AT","CH","FR","IT","ES","NL","SE","PL","DK","NO","FI","IE","UK"]
+
+def _bool(s: pd.Series) -> np.ndarray:
+    return s.to_numpy(dtype=bool, na_value=False)
+
+def ecom_mask(df: pd.DataFrame) -> np.ndarray:
+    # ein Regex-Durchlauf über _search_blob (headline/topic/summary, lower-case) statt apply pro Zeile
+    hit = _bool(df["_search_blob"].str.contains(ECOM_RE))
+    t = df["type"]
+    ecom_types = [c for c in t.cat.categories if str(c).lower() in ("ecommerce","retail_media")]
+    return hit | _bool(t.isin(ecom_types))
 
 # ------------------------------ Daten ------------------------------
-data = load_json()
+_mtime        = _json_mtime()
+data          = load_json(_mtime)
 company       = data.get("company","Unbekannt")
 generated_at  = data.get("generated_at") or ""
 generated_dt  = parse_dt(generated_at)
@@ -97,12 +232,14 @@ sources       = data.get("sources") or []
 report_md     = data.get("report_markdown") or ""
 report_meta   = data.get("report_meta") or {}
 report_used   = data.get("report_used_sources") or []
+data_version  = f"{_mtime}|{generated_at}"
 
 st.title(f"{company} — EU/DE E-Commerce Agent (No-DB)")
 
 # Header KPIs
 eu_sources = sum(1 for s in sources if is_eu_url(s.get("url","")))
-li_sources = sum(1 for s in sources if "linkedin.com" in (s.get("url","")) or str(s.get("source","")).startswith("linkedin"))
+df_src_all, src_blob, is_li = sources_frame(sources, data_version)
+li_sources = int(is_li.sum())
 
 k1,k2,k3,k4,k5 = st.columns(5)
 k1.metric("Signale", len(signals))
@@ -120,124 +257,105 @@ if report_md:
                        "bericht_eu_de_ecommerce.md", "text/markdown", use_container_width=True)
     with st.expander(f"Quellen im Bericht ({len(report_used)})"):
         if report_used:
-            df_ru = pd.DataFrame(report_used)
-            try:
-                st.dataframe(df_ru, use_container_width=True, hide_index=True,
-                             column_config={"url": st.column_config.LinkColumn("url")})
-            except Exception:
-                st.dataframe(df_ru, use_container_width=True, hide_index=True)
+            # reine Anzeige -> Arrow-Tabelle direkt an st.dataframe, ohne pandas
+            tbl_ru = arrow_table(report_used)
+            show_table(tbl_ru if tbl_ru is not None else pd.DataFrame(report_used))
     st.divider()
 
-# Signale
-st.header("Signale")
-df = flatten_signals(signals)
-
-if df.empty:
-    st.info("Keine Signale vorhanden.")
-else:
-    colf1, colf2, colf3, colf4 = st.columns([2,2,2,3])
-    types = sorted(list(df["type"].dropna().unique()))
-    sel_types = colf1.multiselect("Typ", types, default=types)
-    min_conf = colf2.slider("Min. Confidence", 0.0, 1.0, 0.2, 0.05)
-    only_eu = colf3.checkbox("Nur EU-Regionen", value=False, help="Filtert auf region ∈ {DE, EU, …}")
-    ecom_focus = colf4.checkbox("E-Commerce-Fokus", value=True, help="Zeigt nur E-Commerce/Marktplatz/Retail Media relevante Signale")
-
-    q = st.text_input("Volltextsuche (Headline/Topic/Summary)", "")
-
-    fdf = df.copy()
-    if sel_types: fdf = fdf[fdf["type"].isin(sel_types)]
-    fdf = fdf[(fdf["confidence"].fillna(0) >= min_conf)]
-    if only_eu:
-        fdf = fdf[fdf["region"].fillna("").str.len() > 0]
-        fdf = fdf[fdf["region"].str.upper().isin(["EU","DE","AT","CH","FR","IT","ES","NL","SE","PL","DK","NO","FI","IE","UK"])]
-    if ecom_focus:
-        fdf = fdf[fdf.apply(is_ecom_row, axis=1)]
-    if q:
-        ql=q.lower().strip()
-        mask = (
-            fdf["headline"].fillna("").str.lower().str.contains(ql)
-            | fdf["topic"].fillna("").str.lower().str.contains(ql)
-            | fdf["summary"].fillna("").str.lower().str.contains(ql)
-        )
-        fdf = fdf[mask]
-
-    show_cols = ["type","confidence","headline","metric","value","unit","topic","summary","note","period","region"]
-    show_cols = [c for c in show_cols if c in fdf.columns]
-    st.dataframe(fdf[show_cols].sort_values(by=["confidence","type"], ascending=[False,True]),
-                 use_container_width=True, hide_index=True)
+# Abschnitte als Fragmente: Filter/Suche rerunnen nur den eigenen Abschnitt
+@fragment
+def render_signals(df: pd.DataFrame, signals: list[dict]) -> None:
+    st.header("Signale")
+    if df.empty:
+        st.info("Keine Signale vorhanden.")
+    else:
+        colf1, colf2, colf3, colf4 = st.columns([2,2,2,3])
+        types = list(df["type"].cat.categories)
+        sel_types = colf1.multiselect("Typ", types, default=types)
+        min_conf = colf2.slider("Min. Confidence", 0.0, 1.0, 0.2, 0.05)
+        only_eu = colf3.checkbox("Nur EU-Regionen", value=False, help="Filtert auf region ∈ {DE, EU, …}")
+        ecom_focus = colf4.checkbox("E-Commerce-Fokus", value=True, help="Zeigt nur E-Commerce/Marktplatz/Retail Media relevante Signale")
 
-    c1,c2 = st.columns(2)
-    with c1:
-        st.download_button("Signale als CSV", to_csv_bytes(fdf[show_cols]),
-                           "signals_eu_de_ecom.csv", "text/csv", use_container_width=True)
-    with c2:
-        st.download_button("Signale als JSON", to_json_bytes(fdf.to_dict(orient="records")),
-                           "signals_eu_de_ecom.json", "application/json", use_container_width=True)
+        q = st.text_input("Volltextsuche (Headline/Topic/Summary)", "")
 
-    with st.expander("Signal-Details"):
-        for _, row in fdf.iterrows():
-            st.markdown(f"**{row.get('type','?')}** — {row.get('headline','(ohne Headline)')}")
-            st.json(signals[int(row["idx"])])
+        # alle Filter als eine numpy-Maske, dann genau eine Kopie per iloc
+        mask = np.nan_to_num(df["confidence"].to_numpy(dtype=float, na_value=np.nan), nan=0.0) >= min_conf
+        if sel_types: mask &= _bool(df["type"].isin(sel_types))
+        if only_eu:
+            mask &= _bool(df["region"].fillna("").str.upper().isin(EU_REGIONS))
+        if ecom_focus:
+            mask &= ecom_mask(df)
+        if q:
+            ql=q.lower().strip()
+            mask &= _bool(df["_search_blob"].str.contains(ql, regex=False))
+        fdf = df.iloc[np.flatnonzero(mask)]
 
-st.divider()
+        show_cols = ["type","confidence","headline","metric","value","unit","topic","summary","note","period","region"]
+        show_cols = pd.Index(show_cols).intersection(fdf.columns, sort=False).tolist()
+        st.dataframe(fdf[show_cols], use_container_width=True, hide_index=True)
 
-# LinkedIn View
-st.header("LinkedIn-Quellen")
-li = [s for s in sources if "linkedin.com" in (s.get("url","")) or str(s.get("source","")).startswith("linkedin")]
-if not li:
-    st.caption("Keine LinkedIn-Quellen im Datensatz.")
-else:
-    df_li = pd.DataFrame(li)
-    qli = st.text_input("Suche in LinkedIn-Quellen (Titel/URL/Source)", "", key="q_li")
-    if qli:
-        ql=qli.lower().strip()
-        mask = (
-            df_li["title"].fillna("").str.lower().str.contains(ql)
-            | df_li["url"].fillna("").str.lower().str.contains(ql)
-            | df_li["source"].fillna("").str.lower().str.contains(ql)
-        )
-        df_li = df_li[mask]
-    try:
-        st.dataframe(df_li, use_container_width=True, hide_index=True,
-                     column_config={"url": st.column_config.LinkColumn("url")})
-    except Exception:
-        st.dataframe(df_li, use_container_width=True, hide_index=True)
+        c1,c2 = st.columns(2)
+        with c1:
+            st.download_button("Signale als CSV", to_csv_bytes(fdf[show_cols]),
+                               "signals_eu_de_ecom.csv", "text/csv", use_container_width=True)
+        with c2:
+            st.download_button("Signale als JSON", to_json_bytes(fdf.drop(columns="_search_blob")),
+                               "signals_eu_de_ecom.json", "application/json", use_container_width=True)
+
+        with st.expander("Signal-Details"):
+            for t, h, i in zip(fdf["type"].to_numpy(), fdf["headline"].to_numpy(), fdf["idx"].to_numpy()):
+                st.markdown(f"**{t}** — {h}")
+                st.json(signals[int(i)])
+
+@fragment
+def render_linkedin(df_src_all: pd.DataFrame, src_blob: pd.Series, is_li: np.ndarray) -> None:
+    st.header("LinkedIn-Quellen")
+    if not is_li.any():
+        st.caption("Keine LinkedIn-Quellen im Datensatz.")
+    else:
+        df_li = df_src_all[is_li]
+        qli = st.text_input("Suche in LinkedIn-Quellen (Titel/URL/Source)", "", key="q_li")
+        if qli:
+            ql=qli.lower().strip()
+            df_li = df_li[_bool(src_blob[is_li].str.contains(ql, regex=False))]
+        show_table(df_li)
+
+        c1,c2 = st.columns(2)
+        with c1:
+            st.download_button("LinkedIn-Quellen (CSV)", to_csv_bytes(df_li),
+                               "linkedin_sources.csv","text/csv", use_container_width=True)
+        with c2:
+            st.download_button("LinkedIn-Quellen (JSON)", to_json_bytes(df_li),
+                               "linkedin_sources.json","application/json", use_container_width=True)
+
+@fragment
+def render_sources(df_src_all: pd.DataFrame, src_blob: pd.Series) -> None:
+    st.header("Alle Quellen")
+    if df_src_all.empty:
+        st.info("Keine Quellen vorhanden.")  # kein leeres Grid serialisieren
+        return
+    df_src = df_src_all
+    qsrc = st.text_input("Quellensuche gesamt (Titel/URL/Source)", "", key="qsrc_all")
+    if qsrc:
+        ql=qsrc.lower().strip()
+        df_src = df_src[_bool(src_blob.str.contains(ql, regex=False))]
+    show_table(df_src)
 
     c1,c2 = st.columns(2)
     with c1:
-        st.download_button("LinkedIn-Quellen (CSV)", to_csv_bytes(df_li),
-                           "linkedin_sources.csv","text/csv", use_container_width=True)
+        st.download_button("Quellen (CSV)", to_csv_bytes(df_src),
+                           "sources_all.csv","text/csv", use_container_width=True)
     with c2:
-        st.download_button("LinkedIn-Quellen (JSON)", to_json_bytes(df_li.to_dict(orient="records")),
-                           "linkedin_sources.json","application/json", use_container_width=True)
+        st.download_button("Quellen (JSON)", to_json_bytes(df_src),
+                           "sources_all.json","application/json", use_container_width=True)
 
+render_signals(flatten_signals(signals, data_version), signals)
 st.divider()
-
-# Alle Quellen
-st.header("Alle Quellen")
-df_src = pd.DataFrame(sources) if sources else pd.DataFrame(columns=["title","url","source"])
-qsrc = st.text_input("Quellensuche gesamt (Titel/URL/Source)", "", key="qsrc_all")
-if qsrc:
-    ql=qsrc.lower().strip()
-    mask = (
-        df_src["title"].fillna("").str.lower().str.contains(ql)
-        | df_src["url"].fillna("").str.lower().str.contains(ql)
-        | df_src["source"].fillna("").str.lower().str.contains(ql)
-    )
-    df_src = df_src[mask]
-try:
-    st.dataframe(df_src, use_container_width=True, hide_index=True,
-                 column_config={"url": st.column_config.LinkColumn("url")})
-except Exception:
-    st.dataframe(df_src, use_container_width=True, hide_index=True)
-
-c1,c2 = st.columns(2)
-with c1:
-    st.download_button("Quellen (CSV)", to_csv_bytes(df_src),
-                       "sources_all.csv","text/csv", use_container_width=True)
-with c2:
-    st.download_button("Quellen (JSON)", to_json_bytes(df_src.to_dict(orient="records")),
-                       "sources_all.json","application/json", use_container_width=True)
+render_linkedin(df_src_all, src_blob, is_li)
+st.divider()
+render_sources(df_src_all, src_blob)
 
 with st.expander("Rohdaten (latest.json)"):
-    st.json(data)
+    # st.json serialisiert den kompletten Baum -> nur auf Wunsch
+    if st.checkbox("Daten laden", key="show_raw"):
+        st.json(data)
@@ -1,6 +1,7 @@
 # db.py
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 import os, socket
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
 try:
@@ -19,6 +20,19 @@ def _get_raw_url():
         url = "postgresql://" + url[len("postgres://"):]
     return url
 
+def _lookup_ipv4(host: str):
+    # erste IPv4-Adresse, ungecacht
+    try:
+        infos = socket.getaddrinfo(host, None, socket.AF_INET)
+    except Exception:
+        return None
+    return infos[0][4][0] if infos else None
+
+@lru_cache(maxsize=4)
+def _resolve_ipv4(host: str):
+    # gecacht, damit Reloads für die URL nicht erneut auflösen; Verbindungen lösen selbst neu auf (get_engine)
+    return _lookup_ipv4(host)
+
 def _enforce_ssl_and_ipv4(url: str) -> str:
     u = urlparse(url)
     # Query-Params zusammenführen
@@ -29,15 +43,10 @@ def _enforce_ssl_and_ipv4(url: str) -> str:
     # IPv4-Host auflösen und als hostaddr anhängen (nur wenn verfügbar)
     host = u.hostname
     if host:
-        try:
-            # erste IPv4-Adresse nehmen
-            infos = socket.getaddrinfo(host, None, socket.AF_INET)
-            if infos:
-                ipv4 = infos[0][4][0]
-                q["hostaddr"] = ipv4
-        except Exception:
-            # wenn IPv4 nicht auflösbar, lassen wir hostaddr weg
-            pass
+        ipv4 = _resolve_ipv4(host)
+        if ipv4:
+            q["hostaddr"] = ipv4
+        # wenn IPv4 nicht auflösbar, lassen wir hostaddr weg
 
     new_query = urlencode(q)
     # schema sicherstellen
@@ -52,22 +61,129 @@ def _enforce_ssl_and_ipv4(url: str) -> str:
     ))
     return new_url
 
-DATABASE_URL = _enforce_ssl_and_ipv4(_get_raw_url())
+@lru_cache(maxsize=1)
+def get_database_url() -> str:
+    # ENV/Secrets + URL-Umbau nur einmal pro Prozess
+    return _enforce_ssl_and_ipv4(_get_raw_url())
+
+# Pool groß genug für mehrere gleichzeitige Streamlit-Sessions; per ENV anpassbar
+DB_POOL_SIZE         = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW      = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+
+@lru_cache(maxsize=1)
+def get_engine():
+    # eine Engine (ein Pool) pro Prozess; erst beim ersten Zugriff erzeugt
+    engine = create_engine(
+        get_database_url(),
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=30,    # max. Wartezeit auf eine freie Verbindung
+        pool_recycle=1800,  # Verbindungen regelmäßig erneuern (Idle-Kills, IP-Wechsel beim Failover, s. u.)
+        connect_args={
+            "connect_timeout": 10,
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}",
+        },
+        echo=False,
+    )
+    host = urlparse(get_database_url()).hostname
+    if host:
+        @event.listens_for(engine, "do_connect")
+        def _fresh_hostaddr(dialect, conn_rec, cargs, cparams):
+            # hostaddr aus der URL ist beim Start eingefroren -> je neuer Verbindung neu auflösen,
+            # sonst verbinden recycelte Verbindungen nach einem Failover wieder auf die alte IP
+            ipv4 = _lookup_ipv4(host)
+            if ipv4:
+                cparams["hostaddr"] = ipv4
+    return engine
+
+def __getattr__(name: str):
+    # Rückwärtskompatibel: `from db import engine` / `db.DATABASE_URL` weiterhin möglich
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return get_database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# models.sql liegt neben db.py; einmal lesen, text() einmal bauen
+MODELS_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models.sql")
+
+@lru_cache(maxsize=1)
+def _models_sql() -> str:
+    with open(MODELS_SQL_PATH, encoding="utf-8") as f:
+        return f.read()
+
+@lru_cache(maxsize=1)
+def _models_stmt():
+    return text(_models_sql())
+
+# ---- Async-Variante (asyncpg) für die async Pipeline; sync engine bleibt für bestehende Aufrufer ----
+def _async_url(url: str) -> str:
+    # asyncpg kennt weder sslmode noch hostaddr als Query-Parameter -> SSL über connect_args
+    u = urlparse(url)
+    q = {k: v for k, v in parse_qsl(u.query or "", keep_blank_values=True) if k not in ("sslmode", "hostaddr")}
+    return urlunparse(("postgresql+asyncpg", u.netloc, u.path, u.params, urlencode(q), u.fragment))
+
+@lru_cache(maxsize=1)
+def get_async_engine():
+    # lazy: asyncpg/SQLAlchemy-asyncio werden nur geladen, wenn jemand async arbeitet
+    from sqlalchemy.ext.asyncio import create_async_engine
+    return create_async_engine(
+        _async_url(get_database_url()),
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+        connect_args={
+            "ssl": "require",
+            "timeout": 10,
+            "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT)},
+        },
+        echo=False,
+    )
+
+async def init_db_async():
+    engine_async = get_async_engine()
+    async with engine_async.begin() as conn:
+        # mehrere DDL-Statements: asyncpg nur über das Simple-Query-Protokoll (ohne Prepare)
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.execute(_models_sql())
+
+# ---- Spaltenorientiertes Lesen (Arrow) ohne Python-Zeilenobjekte ----
+def read_df(sql: str, *, use: str = "pandas"):
+    """
+    Führt eine SELECT-Abfrage aus und liefert use="pandas" (ArrowDtype), "polars" oder "arrow".
+    Mit connectorx geht das Ergebnis direkt nach Arrow; ohne connectorx Fallback auf pd.read_sql.
+    """
+    import pandas as pd
+    try:
+        import connectorx as cx
+    except Exception:
+        cx = None
+
+    if cx is not None:
+        # connectorx kennt hostaddr nicht
+        u = urlparse(get_database_url())
+        q = {k: v for k, v in parse_qsl(u.query or "", keep_blank_values=True) if k != "hostaddr"}
+        tbl = cx.read_sql(urlunparse(u._replace(query=urlencode(q))), sql, return_type="arrow")
+    else:
+        if use == "pandas":
+            return pd.read_sql(text(sql), get_engine(), dtype_backend="pyarrow")
+        import pyarrow as pa
+        tbl = pa.Table.from_pandas(pd.read_sql(text(sql), get_engine()), preserve_index=False)
 
-# kleiner, stabiler Pool; schneller Timeout
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=0,
-    connect_args={"connect_timeout": 10},
-    echo=False,
-)
+    if use == "arrow":
+        return tbl
+    if use == "polars":
+        import polars as pl
+        return pl.from_arrow(tbl)
+    return tbl.to_pandas(types_mapper=pd.ArrowDtype)
 
 def init_db():
-    with engine.begin() as conn:
-        sql = open('models.sql', encoding="utf-8").read()
-        conn.execute(text(sql))
+    with get_engine().begin() as conn:
+        conn.execute(_models_stmt())
 
 if __name__ == '__main__':
     init_db()
@@ -7,10 +7,17 @@ Streamlit Secrets. Erwartet die Prompt-Datei unter prompts/extract_prompt.txt.
 
 from __future__ import annotations
 import os
-import re
 import json
+import time
+import asyncio
+from functools import lru_cache
 from typing import List, Optional
 
+try:
+    import orjson  # schneller als json.loads für die LLM-Antworten
+except Exception:
+    orjson = None
+
 # .env laden (lokal)
 from dotenv import load_dotenv
 load_dotenv()
@@ -35,13 +42,28 @@ if not OPENAI_API_KEY:
 
 openai.api_key = OPENAI_API_KEY
 
+# JSON-Mode: Modell liefert garantiert ein JSON-Objekt -> kein Regex-Parsing nötig
+RESPONSE_FORMAT = {"type": "json_object"}
+
+
+@lru_cache(maxsize=1)
+def _client():
+    # ein Client pro Prozess (Verbindungspool wird wiederverwendet)
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+# Parallele LLM-Aufrufe in extract_many (Rate-Limits beachten)
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "8"))
+
 # -----------------------------
 # Modelle (Pydantic)
 # -----------------------------
-from pydantic import BaseModel, ValidationError, Field
+from pydantic import BaseModel, ConfigDict, ValidationError, Field
 
 
+# Pydantic v2: Validierung läuft in pydantic-core (Rust); unbekannte Keys werden ignoriert
 class Signal(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     type: str = Field(..., description="Signaltyp, z. B. Financials, Restructuring, ...")
     value: dict = Field(..., description="Strukturierte Payload (Zahl, Einheit, Zeitraum, Notizen).")
     verbatim: Optional[str] = Field(None, description="Kurzes Belegzitat (<=20 Wörter).")
@@ -49,6 +71,8 @@ class Signal(BaseModel):
 
 
 class ExtractionResult(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     company: str
     signals: List[Signal]
     detected_at: Optional[str] = None
@@ -70,49 +94,85 @@ def _load_prompt() -> str:
         return f.read()
 
 
+@lru_cache(maxsize=1)
+def _prompt_parts() -> tuple:
+    # Einmal lesen und an den Platzhaltern zerlegen; pro Aufruf nur noch ein join
+    head, sep, tail = _load_prompt().partition("<<SOURCE_TEXT>>")
+    return tuple(head.split("<<COMPANY>>")), tuple(tail.split("<<COMPANY>>")), bool(sep)
+
+
 # -----------------------------
 # JSON-Parsing Hilfen
 # -----------------------------
-_JSON_BLOCK_RE = re.compile(
-    r"(?:```json\s*)?(\{[\s\S]*\})(?:\s*```)?", re.IGNORECASE
-)
+def _loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
 
 
 def _coerce_json(payload: str) -> dict:
     """
-    Versucht mehrere Strategien, um valides JSON aus einem LLM-String zu gewinnen:
-    1) Direkt json.loads
-    2) JSON-Block zwischen ```json ... ``` extrahieren
-    3) Größtes {...}-Objekt per Regex extrahieren
+    Gewinnt das JSON-Objekt aus dem LLM-String. Mit JSON-Mode reicht i. d. R. der
+    direkte Parse; die Klammer-Heuristik bleibt als günstiger Fallback (z. B. Codefence).
     """
     # 1) Direkt
     try:
-        return json.loads(payload)
+        return _loads(payload)
     except Exception:
         pass
 
-    # 2/3) Codefence oder größtes Objekt
-    m = _JSON_BLOCK_RE.search(payload)
-    if m:
-        candidate = m.group(1)
-        try:
-            return json.loads(candidate)
-        except Exception:
-            # Letzter Rettungsanker: geschweifte Klammern austarieren
-            pass
-
-    # 4) Einfache Klammer-Balance-Heuristik (stabil bei einzelnen Top-Level-Objekten)
+    # 2) Äußerstes {...} (stabil bei einzelnen Top-Level-Objekten)
     start = payload.find("{")
     end = payload.rfind("}")
     if start != -1 and end != -1 and end > start:
         try:
-            return json.loads(payload[start : end + 1])
+            return _loads(payload[start : end + 1])
         except Exception:
             pass
 
     raise ValueError("Konnte keine gültige JSON-Antwort aus dem LLM-Output extrahieren.")
 
 
+# -----------------------------
+# Prompt bauen / Antwort validieren (sync + async)
+# -----------------------------
+def _build_messages(text: str, company: str) -> list:
+    head, tail, has_text = _prompt_parts()
+    prompt = "".join((
+        company.join(head),
+        text[:40_000] if has_text else "",  # Sicherheitslimit
+        company.join(tail),
+    ))
+    return [
+        {"role": "system", "content": "Du bist ein faktenorientierter Extraktor. Antworte ausschließlich als JSON."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _precheck(data) -> None:
+    # billige Strukturprüfung vor Pydantic: offensichtlich falsche Antworten früh abweisen
+    if not isinstance(data, dict):
+        raise ValueError(f"LLM-Antwort ist kein JSON-Objekt, sondern {type(data).__name__}.")
+    sigs = data.get("signals")
+    if not isinstance(sigs, list) or not all(isinstance(x, dict) for x in sigs):
+        raise ValueError("LLM-Antwort ohne gültige 'signals'-Liste.")
+
+
+def _to_result(content: str) -> ExtractionResult:
+    data = _coerce_json(content)
+    _precheck(data)
+
+    try:
+        result = ExtractionResult.model_validate(data)
+    except ValidationError as e:
+        # Für Debugging in Logs hilfreich
+        raise ValueError(f"Pydantic-Validierung fehlgeschlagen: {e}") from e
+
+    # Sanity-Check: Liste vorhanden, sonst leeres Array setzen
+    if result.signals is None:
+        result.signals = []
+
+    return result
+
+
 # -----------------------------
 # LLM-Aufruf
 # -----------------------------
@@ -126,37 +186,138 @@ def call_llm_extract(
     """
     Ruft das LLM auf, erzwingt JSON-Output und validiert gegen Pydantic.
     """
-    base_prompt = _load_prompt()
-    prompt = (
-        base_prompt.replace("<<COMPANY>>", company)
-        .replace("<<SOURCE_TEXT>>", text[:40_000])  # Sicherheitslimit
+    resp = _client().chat.completions.create(
+        model=model,
+        temperature=temperature,
+        messages=_build_messages(text, company),
+        max_tokens=max_tokens,
+        response_format=RESPONSE_FORMAT,
     )
+    return _to_result(resp.choices[0].message.content)
 
-    # ChatCompletion (kompatibel mit vielen OpenAI-Versionen)
-    resp = openai.ChatCompletion.create(
+
+# -----------------------------
+# Async-Variante (viele Dokumente parallel)
+# -----------------------------
+async def call_llm_extract_async(
+    text: str,
+    company: str = "Pernod Ricard",
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 900,
+    temperature: float = 0.1,
+    client=None,
+) -> ExtractionResult:
+    """
+    Wie call_llm_extract, aber über AsyncOpenAI. Ohne client wird ein eigener erzeugt.
+    """
+    if client is None:
+        from openai import AsyncOpenAI
+        async with AsyncOpenAI(api_key=OPENAI_API_KEY) as own:
+            return await call_llm_extract_async(text, company, model, max_tokens, temperature, own)
+
+    resp = await client.chat.completions.create(
         model=model,
         temperature=temperature,
-        messages=[
-            {"role": "system", "content": "Du bist ein faktenorientierter Extraktor. Antworte ausschließlich als JSON."},
-            {"role": "user", "content": prompt},
-        ],
+        messages=_build_messages(text, company),
         max_tokens=max_tokens,
+        response_format=RESPONSE_FORMAT,
     )
+    return _to_result(resp.choices[0].message.content)
 
-    content = resp["choices"][0]["message"]["content"]
-    data = _coerce_json(content)
 
-    try:
-        result = ExtractionResult(**data)
-    except ValidationError as e:
-        # Für Debugging in Logs hilfreich
-        raise ValueError(f"Pydantic-Validierung fehlgeschlagen: {e}") from e
+async def _extract_many(texts: List[str], company: str, concurrency: int) -> List[ExtractionResult]:
+    from openai import AsyncOpenAI
+    sem = asyncio.Semaphore(max(1, concurrency))
 
-    # Sanity-Check: Liste vorhanden, sonst leeres Array setzen
-    if result.signals is None:
-        result.signals = []
+    async with AsyncOpenAI(api_key=OPENAI_API_KEY) as client:
+        async def one(t: str) -> ExtractionResult:
+            async with sem:
+                return await call_llm_extract_async(t, company=company, client=client)
+        return await asyncio.gather(*(one(t) for t in texts))
 
-    return result
+
+def extract_many(
+    texts: List[str],
+    company: str = "Pernod Ricard",
+    concurrency: int = EXTRACT_CONCURRENCY,
+) -> List[ExtractionResult]:
+    """
+    Extrahiert mehrere Texte parallel (max. `concurrency` gleichzeitige Requests).
+    Reihenfolge der Ergebnisse entspricht `texts`.
+    """
+    return asyncio.run(_extract_many(list(texts), company, concurrency))
+
+
+# -----------------------------
+# Batch-API (nächtliche/Offline-Läufe: ~50 % günstiger, Ergebnis binnen 24h)
+# -----------------------------
+def submit_extract_batch(
+    texts: List[str],
+    company: str = "Pernod Ricard",
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 900,
+    temperature: float = 0.1,
+) -> str:
+    """
+    Lädt alle Texte als JSONL hoch und startet einen Batch. Gibt die batch_id zurück.
+    custom_id ist der Index in `texts`.
+    """
+    client = _client()
+    lines = []
+    for i, t in enumerate(texts):
+        body = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": _build_messages(t, company),
+            "response_format": RESPONSE_FORMAT,
+        }
+        lines.append(json.dumps(
+            {"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": body},
+            ensure_ascii=False,
+        ))
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+    f = client.files.create(file=("extract_batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=f.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    return batch.id
+
+
+def collect_extract_batch(
+    batch_id: str, wait: bool = False, poll_seconds: float = 60.0
+) -> Optional[List[Optional[ExtractionResult]]]:
+    """
+    Holt die Ergebnisse eines Batches (Reihenfolge wie bei submit_extract_batch).
+    Noch nicht fertig -> None (bzw. mit wait=True pollen). Fehlgeschlagene Einträge -> None.
+    """
+    client = _client()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            break
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} beendet mit Status {batch.status}")
+        if not wait:
+            return None
+        time.sleep(poll_seconds)
+
+    text = client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+    out: dict = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        row = _loads(line)
+        i = int(row["custom_id"])
+        resp = row.get("response") or {}
+        if row.get("error") or resp.get("status_code") != 200:
+            continue
+        try:
+            out[i] = _to_result(resp["body"]["choices"][0]["message"]["content"])
+        except (ValueError, KeyError, IndexError):
+            pass  # einzelne kaputte Antwort -> None
+    total = batch.request_counts.total if batch.request_counts else 0
+    return [out.get(i) for i in range(max(total, max(out, default=-1) + 1))]
 
 
 # -----------------------------
@@ -180,6 +341,6 @@ if __name__ == "__main__":
     )
     try:
         out = call_llm_extract(demo, company="Pernod Ricard")
-        print(json.dumps(out.dict(), indent=2, ensure_ascii=False))
+        print(json.dumps(out.model_dump(), indent=2, ensure_ascii=False))
     except Exception as exc:
         print("Extraction error:", exc)
@@ -17,7 +17,7 @@ async def fetch_url(url: str, timeout: int = 15) -> dict:
         title = doc.short_title()
         content = doc.summary()
         # strip html
-        soup = BeautifulSoup(content, "html.parser")
+        soup = BeautifulSoup(content, "lxml")
         plain = soup.get_text(separator=" ").strip()
         # try to detect a date from meta tags
         published = None
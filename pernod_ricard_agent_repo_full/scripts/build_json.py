@@ -6,16 +6,37 @@
 
 import os
 import re
+import logging
 import json
 import html
 import math
+import time
+import hashlib
+import sqlite3
+import threading
+import weakref
+import asyncio
 import urllib.parse as ul
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Literal
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import lxml.html
+from lxml import etree
 import feedparser
 from dateutil import parser as dateparser
+from pydantic import BaseModel
+
+try:
+    import orjson  # schnelleres Lesen/Schreiben (LLM-Antworten, Caches, latest.json)
+except Exception:
+    orjson = None
 
 # optional .env (lokal)
 try:
@@ -24,6 +45,8 @@ try:
 except Exception:
     pass
 
+log = logging.getLogger(__name__)  # ohne Konfiguration landen Warnungen auf stderr
+
 # ============================ Konfiguration ==================================
 COMPANY = os.getenv("COMPANY", "Pernod Ricard")
 
@@ -72,18 +95,49 @@ LOOKBACK_HOURS = LOOKBACK_DAYS * 24
 MAX_PER_SOURCE = int(os.getenv("MAX_PER_SOURCE", "10"))
 TOP_TEXTS      = int(os.getenv("TOP_TEXTS", "14"))
 SIGNAL_LIMIT   = int(os.getenv("SIGNAL_LIMIT", "10"))
+# Nachforderung, wenn der Batch zu wenige Signale liefert: so viele Artikel, je Artikel so viele Signale
+FOLLOWUP_ARTICLES            = int(os.getenv("FOLLOWUP_ARTICLES", "6"))
+FOLLOWUP_SIGNALS_PER_ARTICLE = int(os.getenv("FOLLOWUP_SIGNALS_PER_ARTICLE", "2"))
 
 # Mindestlängen
 MIN_TEXT_CHARS_ARTICLE  = int(os.getenv("MIN_TEXT_CHARS_ARTICLE", "600"))
 MIN_TEXT_CHARS_LINKEDIN = int(os.getenv("MIN_TEXT_CHARS_LINKEDIN", "140"))
+MIN_UNIQUE_RATIO        = float(os.getenv("MIN_UNIQUE_RATIO", "0.15"))  # Anteil verschiedener Wörter; darunter Boilerplate
+BATCH_PROMPT_CHARS      = int(os.getenv("BATCH_PROMPT_CHARS", "22000"))  # Zeichenbudget der Batch-Signal-Anfrage
 
 # HTTP
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; EU-DE-Ecom-Agent/1.0)"}
 TIMEOUT = 30
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "10"))  # parallele Artikel-Downloads
+PARSE_WORKERS     = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 4)))  # Threads für lxml/Readability
+MAX_FETCH_BYTES   = int(os.getenv("MAX_FETCH_BYTES", "2000000"))  # größere Seiten werden abgeschnitten
+MAX_PARSE_BYTES   = int(os.getenv("MAX_PARSE_BYTES", "1000000"))  # nur so viel HTML geht in lxml/Readability
+MAX_TEXT_CHARS    = int(os.getenv("MAX_TEXT_CHARS", "20000"))     # mehr Text je Artikel nutzt kein Prompt-Budget
+FETCH_STOP_AFTER  = int(os.getenv("FETCH_STOP_AFTER", "0"))     # 0 = alles laden; sonst Abbruch nach n brauchbaren Texten
+FETCH_RETRIES     = int(os.getenv("FETCH_RETRIES", "2"))        # Wiederholungen bei Verbindungsfehlern (async)
+# Anfragen/s je Host (Token-Bucket), damit parallele Downloads keine 429 auslösen
+HOST_RATE_LIMITS  = {"news.google.com": 5.0, "www.pernod-ricard.com": 3.0}
+DEFAULT_HOST_RPS  = float(os.getenv("DEFAULT_HOST_RPS", "10"))
+
+# HTTP-Cache (ETag/Last-Modified, über Läufe hinweg via Actions-Cache); leer = aus
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "data/http_cache.sqlite")
+# Seiten/Extraktionen, die so lange weder geladen noch per 304 bestätigt wurden, fliegen beim Schließen raus
+HTTP_CACHE_MAX_AGE_HOURS = int(os.getenv("HTTP_CACHE_MAX_AGE_HOURS", str(LOOKBACK_HOURS)))
 
 # OpenAI
 OPENAI_API_KEY = (os.getenv("OPENAI_API_KEY") or "").strip()
 OPENAI_MODEL   = os.getenv("OPENAI_MODEL", "gpt-5")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # parallele OpenAI-Anfragen
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))  # SDK wiederholt 429/5xx/Verbindungsfehler mit exp. Backoff
+LLM_FAIL_MAX    = int(os.getenv("LLM_FAIL_MAX", "5"))     # so viele Fehlschläge in Folge -> Breaker offen
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "60"))  # Sekunden, bis wieder ein Versuch durchgeht
+# proaktive Drosselung nach dem Limit des Accounts (0 = aus): Anfragen bzw. Tokens pro Minute
+LLM_MAX_RPM = float(os.getenv("LLM_MAX_RPM", "0"))
+LLM_MAX_TPM = float(os.getenv("LLM_MAX_TPM", "0"))
+
+# LLM-Cache (Signale und Bericht je Eingabetext; über Läufe hinweg via Actions-Cache)
+SIGNAL_CACHE_PATH = os.getenv("SIGNAL_CACHE_PATH", "data/signal_cache.json")
+SIGNAL_CACHE_TTL_DAYS = float(os.getenv("SIGNAL_CACHE_TTL_DAYS", "7"))  # ältere Einträge werden neu erzeugt
 
 # Bericht
 REPORT_MAX_TEXTS     = int(os.getenv("REPORT_MAX_TEXTS", "14"))
@@ -94,6 +148,15 @@ EU_TLDS = (
     ".de",".at",".ch",".fr",".it",".es",".nl",".se",".pl",".dk",".no",".fi",".ie",".uk",".eu"
 )
 
+# Firmenbezug: Namensbestandteile + (für den Default) Pernod-Ricard-Marken; Texte ohne Treffer gehen nicht ans LLM
+_PR_BRANDS = [
+    "absolut","martell","jameson","chivas","glenlivet","havana club","malibu","beefeater",
+    "ballantine","lillet","ramazzotti","mumm","perrier-jou","kahl","olmeca","monkey 47",
+]
+COMPANY_KEYWORDS = [k.strip().lower() for k in os.getenv("COMPANY_KEYWORDS", "").split(",") if k.strip()] or (
+    [w for w in COMPANY.lower().split() if len(w) > 2] + (_PR_BRANDS if COMPANY == "Pernod Ricard" else [])
+)
+
 ECOM_KEYWORDS = [
     "e-commerce","ecommerce","onlinehandel","marktplatz","marketplace",
     "retail media","amazon","zalando","d2c","online sales","digital commerce",
@@ -101,6 +164,9 @@ ECOM_KEYWORDS = [
     "gmv","cart","buy box","fulfillment","fba","retouren","click & collect"
 ]
 
+def _loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
 # ---------- LLM-Kompatibilitäts-Helpers (Responses-API + Fallback) ----------
 def _extract_responses_text(resp):
     # OpenAI Python SDK >= 1.30 hat meist resp.output_text
@@ -123,155 +189,534 @@ def _extract_responses_text(resp):
         pass
     raise RuntimeError("Responses-API: kein Text im Response gefunden")
 
-def llm_json(system_msg: str, user_msg: str) -> dict:
-    """Versucht zuerst Responses-API (GPT-5), fällt auf Chat Completions zurück. Liefert JSON-Objekt."""
+_llm_state = weakref.WeakKeyDictionary()
+
+def _llm():
+    """(AsyncOpenAI-Client, Semaphore, (RPM-, TPM-Bucket)) je Event-Loop: ein Client teilt den httpx-Pool über alle
+    Aufrufe, der Semaphor begrenzt parallele Anfragen, die Buckets halten Minuten-Limits ein, bevor 429 kommt."""
+    loop = asyncio.get_running_loop()
+    st = _llm_state.get(loop)
+    if st is None:
+        from openai import AsyncOpenAI
+        buckets = tuple(RateLimiter(lim / 60, capacity=lim) if lim > 0 else None for lim in (LLM_MAX_RPM, LLM_MAX_TPM))
+        st = _llm_state[loop] = (AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=LLM_MAX_RETRIES),
+                                 asyncio.Semaphore(LLM_CONCURRENCY), buckets)
+    return st
+
+def _temperature_kwargs() -> dict:
+    # GPT-5 akzeptiert nur die Standard-Temperatur; sonst 0 -> deterministisch, Cache-Einträge bleiben gültig
+    return {} if str(OPENAI_MODEL).startswith("gpt-5") else {"temperature": 0}
+
+async def _llm_throttle(buckets, *msgs: str):
+    rpm, tpm = buckets
+    if rpm: await rpm.acquire()
+    if tpm: await tpm.acquire(sum(len(m) for m in msgs) / 4)  # grobe Schätzung: ~4 Zeichen je Token
+
+class CircuitBreaker:
+    """Nach `fail_max` Fehlschlägen in Folge für `reset_timeout` s offen: Aufrufe scheitern sofort,
+    statt minutenlang gegen einen toten Endpunkt zu laufen (-> heuristic_summary)."""
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.fails = 0
+        self.open_until = 0.0
+        self.total_fails = 0  # alle Fehlschläge seit Start (auch abgewiesene), für "lief jeder LLM-Schritt durch?"
+
+    async def call(self, fn, *args):
+        if self.fails >= self.fail_max and time.monotonic() < self.open_until:
+            self.total_fails += 1
+            raise RuntimeError("LLM vorübergehend deaktiviert (zu viele Fehlschläge in Folge)")
+        try:
+            res = await fn(*args)
+        except Exception:
+            self.total_fails += 1
+            self.fails += 1
+            if self.fails >= self.fail_max:
+                self.open_until = time.monotonic() + self.reset_timeout
+            raise
+        self.fails = 0
+        return res
+
+_llm_breaker = CircuitBreaker(LLM_FAIL_MAX, LLM_BREAKER_RESET)
+
+async def llm_json(system_msg: str, user_msg: str, schema: type[BaseModel] | None = None) -> dict:
+    """Versucht zuerst Responses-API (GPT-5), fällt auf Chat Completions zurück. Liefert JSON-Objekt.
+    Mit `schema` zuerst Structured Outputs (Pydantic-Modell, serverseitig validiert)."""
     if not OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY fehlt")
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    return await _llm_breaker.call(_llm_json_call, system_msg, user_msg, schema)
 
-    # 1) Responses-API (bevorzugt für GPT-5)
-    try:
-        kwargs = {
-            "model": OPENAI_MODEL,
-            "input": [
-                {"role": "system", "content": system_msg},
-                {"role": "user",   "content": user_msg},
-            ],
-            "response_format": {"type": "json_object"},
-        }
-        # optionale GPT-5 Regler
-        if str(OPENAI_MODEL).startswith("gpt-5"):
-            kwargs["reasoning"] = {"effort": "medium"}
-            # kwargs["text"] = {"verbosity": "medium"}  # optional
-
-        r = client.responses.create(**kwargs)
-        txt = _extract_responses_text(r)
-        return json.loads(txt)
-    except Exception as e_responses:
-        # 2) Fallback: Chat Completions (für gpt-4o-mini etc.)
+async def llm_text(system_msg: str, user_msg: str) -> str:
+    """Wie oben, nur dass reiner Text zurückgegeben wird (für den Bericht)."""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY fehlt")
+    return await _llm_breaker.call(_llm_text_call, system_msg, user_msg)
+
+async def _llm_json_call(system_msg: str, user_msg: str, schema: type[BaseModel] | None) -> dict:
+    client, sem, buckets = _llm()
+    async with sem:  # max. LLM_CONCURRENCY Anfragen gleichzeitig
+        await _llm_throttle(buckets, system_msg, user_msg)
+        # 0) Structured Outputs: Antwort passt garantiert aufs Schema, keine kaputten JSON-Antworten
+        if schema is not None:
+            from openai import BadRequestError
+            try:
+                r = await client.beta.chat.completions.parse(
+                    model=OPENAI_MODEL,
+                    response_format=schema,
+                    messages=[
+                        {"role": "system", "content": system_msg},
+                        {"role": "user",   "content": user_msg},
+                    ],
+                    **_temperature_kwargs(),
+                )
+                parsed = r.choices[0].message.parsed
+                if parsed is not None:
+                    return parsed.model_dump(exclude_none=True)
+            except (BadRequestError, TypeError, AttributeError):
+                # nur "nicht unterstützt" (Modell lehnt Schema ab / älteres SDK ohne parse) -> JSON-Modus wie bisher;
+                # Auth-, Rate-Limit- und Netzfehler gehen weiter, statt dieselbe Anfrage noch zweimal zu schicken
+                pass
+        # 1) Responses-API (bevorzugt für GPT-5)
         try:
-            r = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                temperature=0.2,
-                response_format={"type": "json_object"},
-                messages=[
+            kwargs = {
+                "model": OPENAI_MODEL,
+                "input": [
                     {"role": "system", "content": system_msg},
                     {"role": "user",   "content": user_msg},
                 ],
-            )
-            content = r.choices[0].message.content
-            return json.loads(content)
-        except Exception as e_chat:
-            raise RuntimeError(f"LLM JSON fehlgeschlagen (responses: {e_responses}; chat: {e_chat})")
-
-def llm_text(system_msg: str, user_msg: str) -> str:
-    """Wie oben, nur dass reiner Text zurückgegeben wird (für den Bericht)."""
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY fehlt")
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
-
-    # Responses-API zuerst
-    try:
-        kwargs = {
-            "model": OPENAI_MODEL,
-            "input": [
-                {"role": "system", "content": system_msg},
-                {"role": "user",   "content": user_msg},
-            ],
-        }
-        if str(OPENAI_MODEL).startswith("gpt-5"):
-            kwargs["reasoning"] = {"effort": "medium"}
-        r = client.responses.create(**kwargs)
-        return _extract_responses_text(r)
-    except Exception as e_responses:
-        # Fallback: Chat Completions
+                "response_format": {"type": "json_object"},
+            }
+            # optionale GPT-5 Regler
+            if str(OPENAI_MODEL).startswith("gpt-5"):
+                kwargs["reasoning"] = {"effort": "medium"}
+                # kwargs["text"] = {"verbosity": "medium"}  # optional
+
+            r = await client.responses.create(**kwargs)
+            txt = _extract_responses_text(r)
+            return _loads(txt)
+        except Exception as e_responses:
+            # 2) Fallback: Chat Completions (für gpt-4o-mini etc.)
+            try:
+                r = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    response_format={"type": "json_object"},
+                    messages=[
+                        {"role": "system", "content": system_msg},
+                        {"role": "user",   "content": user_msg},
+                    ],
+                    **_temperature_kwargs(),
+                )
+                content = r.choices[0].message.content
+                return _loads(content)
+            except Exception as e_chat:
+                raise RuntimeError(f"LLM JSON fehlgeschlagen (responses: {e_responses}; chat: {e_chat})")
+
+async def _llm_text_call(system_msg: str, user_msg: str) -> str:
+    client, sem, buckets = _llm()
+    async with sem:  # max. LLM_CONCURRENCY Anfragen gleichzeitig
+        await _llm_throttle(buckets, system_msg, user_msg)
+        # Responses-API zuerst
         try:
-            r = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                temperature=0.2,
-                messages=[
+            kwargs = {
+                "model": OPENAI_MODEL,
+                "input": [
                     {"role": "system", "content": system_msg},
                     {"role": "user",   "content": user_msg},
                 ],
-            )
-            return r.choices[0].message.content.strip()
-        except Exception as e_chat:
-            raise RuntimeError(f"LLM TEXT fehlgeschlagen (responses: {e_responses}; chat: {e_chat})")
+            }
+            if str(OPENAI_MODEL).startswith("gpt-5"):
+                kwargs["reasoning"] = {"effort": "medium"}
+            r = await client.responses.create(**kwargs)
+            return _extract_responses_text(r)
+        except Exception as e_responses:
+            # Fallback: Chat Completions
+            try:
+                r = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_msg},
+                        {"role": "user",   "content": user_msg},
+                    ],
+                    **_temperature_kwargs(),
+                )
+                return r.choices[0].message.content.strip()
+            except Exception as e_chat:
+                raise RuntimeError(f"LLM TEXT fehlgeschlagen (responses: {e_responses}; chat: {e_chat})")
 
 # ================================ Utils ======================================
+def write_json(path: str, obj, indent: bool = True):
+    """Schreibt `obj` als UTF-8-JSON; orjson wenn vorhanden (Bytes in einem Rutsch), sonst json.
+    Erst in eine Temp-Datei, dann os.replace -> Leser (App, nächster Lauf) sehen nie eine halbe Datei."""
+    tmp = f"{path}.tmp"
+    if orjson is not None:
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(obj, option=opt))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2 if indent else None)
+    os.replace(tmp, path)
+
 def now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
-def is_recent(dt: datetime, hours: int) -> bool:
-    if not isinstance(dt, datetime):
-        return False
-    return (now_utc() - dt) <= timedelta(hours=hours)
+def join_budget(parts, sep: str, limit: int) -> str:
+    """Wie sep.join(parts)[:limit], hört aber auf, sobald das Budget voll ist (kein großer Zwischenstring)."""
+    out, total = [], 0
+    for part in parts:
+        if out:
+            out.append(sep); total += len(sep)
+        if total + len(part) >= limit:
+            out.append(part[:max(0, limit - total)])
+            break
+        out.append(part); total += len(part)
+    return "".join(out)[:limit]
+
+def parse_date(val) -> datetime | None:
+    """ISO-8601 (Meta-Tags, eigene Items) -> RFC 822 (Feeds) -> dateutil als letzter Versuch; immer mit tz (UTC-Default)."""
+    if not val: return None
+    if isinstance(val, datetime):
+        return val if val.tzinfo else val.replace(tzinfo=timezone.utc)
+    val = str(val).strip()
+    dt = None
+    try:
+        dt = datetime.fromisoformat(val)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(val)
+        except (TypeError, ValueError):
+            try:
+                dt = dateparser.parse(val)
+            except Exception:
+                return None
+    if dt and dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+def _body(buf: bytearray, charset):
+    # Charset aus dem Header -> str; steht er im <meta> -> rohe Bytes, lxml liest ihn selbst (kein Python-Sniffing)
+    buf = bytes(buf[:MAX_FETCH_BYTES])
+    if not charset and (buf.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")) or b"charset" in buf[:2048].lower()):
+        return buf
+    return buf.decode(charset or "utf-8", errors="replace")
+
+# ---- persistenter HTTP-Cache: unveränderte Seiten kommen per 304 statt komplett ----
+_http_cache_lock = threading.Lock()  # Verbindung wird auch aus Parse-Threads genutzt
+
+@lru_cache(maxsize=1)
+def _http_cache():
+    if not HTTP_CACHE_PATH: return None
+    try:
+        os.makedirs(os.path.dirname(HTTP_CACHE_PATH) or ".", exist_ok=True)
+        con = sqlite3.connect(HTTP_CACHE_PATH, check_same_thread=False, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")  # Leser blockieren Schreiber nicht (parallele Läufe/Threads)
+        con.execute("CREATE TABLE IF NOT EXISTS pages "
+                    "(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, charset TEXT, body BLOB, fetched_at REAL)")
+        # Extraktionsergebnis je Seite; gilt nur, solange der Body-Hash passt (304 -> gleicher Body)
+        con.execute("CREATE TABLE IF NOT EXISTS parsed "
+                    "(url TEXT PRIMARY KEY, body_hash TEXT, text TEXT, published_at TEXT, fetched_at REAL)")
+        for table in ("pages", "parsed"):  # Cache aus älteren Läufen
+            try: con.execute(f"ALTER TABLE {table} ADD COLUMN fetched_at REAL")
+            except sqlite3.OperationalError: pass
+        return con
+    except Exception:
+        return None
 
-def fetch(url: str) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-    r.raise_for_status()
-    return r.text
+def _http_cache_sql(sql: str, args: tuple, fetch: bool = False):
+    con = _http_cache()
+    if con is None: return None
+    try:
+        with _http_cache_lock:
+            cur = con.execute(sql, args)
+            return cur.fetchone() if fetch else None
+    except Exception:
+        return None
+
+def close_http_cache():
+    # räumt alte Seiten ab und schließt die Verbindung; dabei wird das WAL in die .sqlite-Datei
+    # zurückgeschrieben (für den Actions-Cache)
+    con = _http_cache()
+    if con is not None:
+        with _http_cache_lock:
+            try:
+                cutoff, removed = time.time() - HTTP_CACHE_MAX_AGE_HOURS * 3600, 0
+                for table in ("pages", "parsed"):
+                    removed += con.execute(f"DELETE FROM {table} WHERE fetched_at IS NULL OR fetched_at < ?",
+                                           (cutoff,)).rowcount
+                if removed > 0: con.execute("VACUUM")  # Datei schrumpft sonst nicht
+            except Exception:
+                pass
+            con.close()
+    _http_cache.cache_clear()
 
+def _http_cache_get(url: str):
+    return _http_cache_sql("SELECT etag, last_modified, charset, body FROM pages WHERE url=?", (url,), fetch=True)
+
+def _http_cache_get_many(urls: list[str]) -> dict:
+    """Cache-Zeilen für alle URLs mit wenigen IN-Abfragen statt einem SELECT pro URL."""
+    con, rows = _http_cache(), {}
+    if con is None: return rows
+    try:
+        with _http_cache_lock:
+            for i in range(0, len(urls), 500):  # unter dem SQLite-Limit für Parameter
+                chunk = urls[i:i + 500]
+                sql = "SELECT url, etag, last_modified, charset, body FROM pages WHERE url IN (%s)" % ",".join("?" * len(chunk))
+                rows.update((r[0], r[1:]) for r in con.execute(sql, chunk))
+    except Exception:
+        pass
+    return rows
+
+def _http_cache_put(url: str, headers, charset, buf):
+    etag, last_mod = headers.get("etag"), headers.get("last-modified")
+    if not (etag or last_mod): return  # ohne Validator keine Revalidierung möglich
+    _http_cache_sql("INSERT OR REPLACE INTO pages (url, etag, last_modified, charset, body, fetched_at) "
+                    "VALUES (?,?,?,?,?,?)", (url, etag, last_mod, charset, bytes(buf[:MAX_FETCH_BYTES]), time.time()))
+
+def _http_cache_touch(url: str):
+    # 304 = Seite noch aktuell und in Gebrauch -> bleibt im Cache
+    _http_cache_sql("UPDATE pages SET fetched_at=? WHERE url=?", (time.time(), url))
+
+def body_hash(body: str | bytes) -> str:
+    return hashlib.blake2b(body.encode("utf-8") if isinstance(body, str) else body, digest_size=16).hexdigest()
+
+def parsed_cache_key(body: str | bytes) -> str:
+    # Body-Hash plus alles, was das Extraktionsergebnis prägt -> neuer Parser/andere Limits = Miss
+    return f"{PARSER_VERSION}:{MAX_PARSE_BYTES}:{MAX_TEXT_CHARS}:{body_hash(body)}"
+
+def parsed_cache_get(url: str, h: str):
+    """(text, published_at) aus einem früheren Lauf, falls Body und Parser unverändert sind; sonst None."""
+    row = _http_cache_sql("SELECT text, published_at FROM parsed WHERE url=? AND body_hash=?", (url, h), fetch=True)
+    if row is None: return None
+    _http_cache_sql("UPDATE parsed SET fetched_at=? WHERE url=?", (time.time(), url))  # in Gebrauch -> bleibt
+    return row[0], (datetime.fromisoformat(row[1]) if row[1] else None)
+
+def parsed_cache_put(url: str, h: str, text: str, dt):
+    _http_cache_sql("INSERT OR REPLACE INTO parsed (url, body_hash, text, published_at, fetched_at) VALUES (?,?,?,?,?)",
+                    (url, h, text, dt.isoformat() if isinstance(dt, datetime) else None, time.time()))
+
+def _revalidate_headers(row) -> dict:
+    h = {}
+    if row and row[0]: h["If-None-Match"] = row[0]
+    if row and row[1]: h["If-Modified-Since"] = row[1]
+    return h
+
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    # eine Session pro Prozess -> TCP/TLS-Verbindung wird zwischen sync-Abrufen wiederverwendet
+    s = requests.Session()
+    s.headers.update(HEADERS)
+    # 429/5xx werden mit Backoff wiederholt (Retry-After wird beachtet); danach liefert raise_for_status den Fehler
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+def fetch(url: str) -> str | bytes:
+    # gestreamt mit Größenlimit: riesige Seiten blockieren nicht und sprengen nicht den Speicher
+    row = _http_cache_get(url)
+    with _session().get(url, headers=_revalidate_headers(row), timeout=TIMEOUT, stream=True) as r:
+        if r.status_code == 304 and row:
+            _http_cache_touch(url)
+            return _body(row[3], row[2])
+        r.raise_for_status()
+        buf = bytearray()
+        for chunk in r.iter_content(65536):
+            buf += chunk
+            if len(buf) > MAX_FETCH_BYTES: break
+        # r.encoding fällt bei text/* ohne charset auf ISO-8859-1 zurück -> nur echten Header-Charset nehmen
+        charset = r.encoding if "charset" in r.headers.get("content-type", "").lower() else None
+        _http_cache_put(url, r.headers, charset, buf)
+        return _body(buf, charset)
+
+async def fetch_async(client: httpx.AsyncClient, url: str, raw: bool = False, rows: dict | None = None) -> str | bytes:
+    """raw=True liefert immer Bytes (z. B. für feedparser, der die XML-Deklaration selbst auswertet).
+    `rows`: vorab geladene Cache-Zeilen (siehe fetch_many), sonst Einzelabfrage."""
+    row = rows.get(url) if rows is not None else _http_cache_get(url)
+    async with client.stream("GET", url, timeout=TIMEOUT, headers=_revalidate_headers(row)) as r:
+        if r.status_code == 304 and row:
+            _http_cache_touch(url)
+            return bytes(row[3]) if raw else _body(row[3], row[2])
+        r.raise_for_status()
+        buf = bytearray()
+        async for chunk in r.aiter_bytes(65536):
+            buf += chunk
+            if len(buf) > MAX_FETCH_BYTES: break
+        _http_cache_put(url, r.headers, r.charset_encoding, buf)
+        return bytes(buf[:MAX_FETCH_BYTES]) if raw else _body(buf, r.charset_encoding)
+
+class RateLimiter:
+    """Token-Bucket: im Mittel `rate` Anfragen (bzw. Tokens) /s, Bursts bis `capacity`."""
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: float = 1):
+        n = min(n, self.capacity)  # größer als der Bucket -> sonst nie erfüllbar
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                await asyncio.sleep((n - self.tokens) / self.rate)
+
+_host_limiters = weakref.WeakKeyDictionary()  # je Event-Loop: {host: RateLimiter}, geteilt von allen fetch_many-Aufrufen
+
+def _limiter(host: str) -> RateLimiter:
+    per_loop = _host_limiters.setdefault(asyncio.get_running_loop(), {})
+    if host not in per_loop:
+        per_loop[host] = RateLimiter(HOST_RATE_LIMITS.get(host, DEFAULT_HOST_RPS))
+    return per_loop[host]
+
+async def fetch_many(urls: list[str], process=None, stop=None, raw: bool = False) -> dict:
+    """Lädt alle URLs parallel (max. FETCH_CONCURRENCY gleichzeitig) -> {url: html}. Fehler kommen als Exception zurück.
+    `await process(url, html)` verarbeitet jede Seite direkt nach dem Download (außerhalb des Semaphors) und ersetzt das Ergebnis.
+    `stop(url, result)` läuft je fertiger Seite in Abschlussreihenfolge; liefert es True, werden die übrigen Downloads abgebrochen."""
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    rows = _http_cache_get_many(list(urls))
+    # Transport wiederholt Verbindungsfehler (Connect/Reset) selbst; HTTP-Fehlercodes bleiben Fehler
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=FETCH_RETRIES)
+    async with httpx.AsyncClient(headers=HEADERS, follow_redirects=True, transport=transport) as client:
+        async def one(u):
+            # erst auf den Host-Token warten, dann den Slot belegen -> ein gedrosselter Host blockiert keine anderen
+            await _limiter(ul.urlsplit(u).netloc.lower()).acquire()
+            async with sem:
+                try:
+                    res = await fetch_async(client, u, raw=raw, rows=rows)
+                except Exception as e:
+                    return u, e
+            if process is None: return u, res
+            try:
+                return u, await process(u, res)
+            except Exception as e:
+                return u, e
+        tasks = [asyncio.create_task(one(u)) for u in urls]
+        out = {}
+        try:
+            for fut in asyncio.as_completed(tasks):
+                u, res = await fut
+                out[u] = res
+                if stop and stop(u, res): break
+        finally:
+            for t in tasks: t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return out
+
+@lru_cache(maxsize=4096)
 def norm_url(u: str) -> str:
     try:
         p = ul.urlsplit(u)
-        q = ul.parse_qsl(p.query, keep_blank_values=True)
-        q = ul.urlencode(sorted(q))
+        q = ""
+        if p.query:  # ohne Query kein parse/urlencode
+            pairs = ul.parse_qsl(p.query, keep_blank_values=True)
+            pairs.sort()
+            q = ul.urlencode(pairs)
         return ul.urlunsplit((p.scheme, p.netloc, p.path.rstrip("/"), q, ""))
     except Exception:
         return u
 
 def dedupe(items, key="url"):
-    seen, out = set(), []
+    # normalisierte URL einmal berechnen und als _nurl am Item ablegen (für spätere Vergleiche);
+    # ein dict ersetzt seen-Set + Liste, erster Treffer gewinnt und behält seine Position
+    out = {}
     for it in items:
-        val = norm_url(it.get(key, "")).lower()
-        if not val or val in seen: continue
-        seen.add(val); out.append(it)
-    return out
-
-def clean_article_text(html_text: str) -> str:
-    if not html_text: return ""
-    text = ""
+        val = it.get("_nurl") or norm_url(it.get(key, "")).lower()
+        if val and val not in out:
+            it["_nurl"] = val
+            out[val] = it
+    return list(out.values())
+
+_NON_WORD = re.compile(r"\W+")
+
+def dedupe_by_text(items, chars: int = 4000):
+    """Gleicher Text (ohne Groß/Klein, Satzzeichen, Leerraum) unter anderer URL, z. B. Agenturmeldungen:
+    nur das erste Vorkommen bleibt -> vorher nach Relevanz sortieren."""
+    out = {}
+    for it in items:
+        h = hashlib.blake2b(_NON_WORD.sub("", it.get("text", "").lower())[:chars].encode("utf-8"), digest_size=16).digest()
+        out.setdefault(h, it)
+    return list(out.values())
+
+_NOISE_TAGS  = ("script", "style", "noscript")
+_CHROME_TAGS = ("header", "footer", "nav", "aside")
+
+def _tree_text(node, limit: int = MAX_TEXT_CHARS) -> str:
+    # Whitespace zusammenfassen, ohne Regex; Abbruch beim Budget -> kein riesiger Zwischen-String
+    words, n = [], 0
+    for chunk in node.itertext():
+        for w in chunk.split():
+            words.append(w); n += len(w) + 1
+        if n > limit: break
+    return " ".join(words)[:limit].rstrip()
+
+def _html_tree(html_text: str | bytes):
     try:
-        from readability import Document
-        doc = Document(html_text)
-        article_html = doc.summary(html_partial=True)
-        soup = BeautifulSoup(article_html, "html.parser")
-        for t in soup(["script","style","noscript"]): t.decompose()
-        text = soup.get_text(" ").strip()
-    except Exception:
-        pass
-    if len(text) < 200:
-        soup = BeautifulSoup(html_text, "html.parser")
-        for t in soup(["script","style","noscript"]): t.decompose()
-        text = soup.get_text(" ").strip()
-    text = re.sub(r"\s+"," ", text)
-    return text
-
-def extract_published_at(html_text: str):
+        return lxml.html.fromstring(html_text)
+    except ValueError:  # str mit <?xml encoding=...?>-Deklaration
+        return lxml.html.fromstring(html_text.encode("utf-8"))
+    except etree.ParserError:  # leeres Dokument
+        return None
+
+# Datumskandidaten in Prioritätsreihenfolge, einmal kompiliert
+_DATE_XPATHS = (
+    etree.XPath("//meta[@name='date']/@content"),
+    etree.XPath("//meta[@property='article:published_time']/@content"),
+    etree.XPath("//time[1]"),
+)
+
+def _tree_date(tree):
+    for xp in _DATE_XPATHS:
+        hit = xp(tree)
+        if hit:
+            v = hit[0]
+            return parse_date(v if isinstance(v, str) else (v.get("datetime") or v.text_content().strip()))
+    return None
+
+PARSER_VERSION = 1  # hochzählen, wenn sich parse_article ändert -> gecachte Extraktionen (Tabelle parsed) werden ungültig
+
+def parse_article(html_text: str | bytes):
+    """(Text, Veröffentlichungsdatum) aus einem einzigen lxml-DOM – Datum, Readability und Fallback teilen sich den Baum."""
+    if not html_text: return "", None
+    tree = _html_tree(html_text)
+    if tree is None: return "", None
     try:
-        soup = BeautifulSoup(html_text, "html.parser")
-        cand = (
-            soup.find("meta", {"name":"date"}) or
-            soup.find("meta", property="article:published_time") or
-            soup.find("time")
-        )
-        if not cand: return None
-        val = cand.get("content") or cand.get("datetime") or cand.get_text(strip=True)
-        dt = dateparser.parse(val)
-        if dt and dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        dt = _tree_date(tree)  # vor dem Entfernen von Kopf-/Fußzeilen, dort steht oft <time>
     except Exception:
-        return None
+        dt = None
+    # Skripte und Seitenrahmen (Navigation, Kopf-/Fußzeilen, Seitenleisten) gleich im selben Baum entfernen
+    etree.strip_elements(tree, *_NOISE_TAGS, *_CHROME_TAGS, with_tail=False)
+    # Readability nur, wenn die Seite nennenswerten Fließtext in <p> hat
+    p_chars = sum(len(p.text_content()) for p in tree.iter("p"))
+    if p_chars >= 200:
+        try:
+            from readability import Document
+            article_html = Document(tree).summary(html_partial=True)
+            text = _tree_text(lxml.html.fromstring(article_html))
+            if len(text) >= 200:
+                return text, dt
+        except Exception:
+            pass
+    # Fallback: erst <article>, dann <main> (weniger Teaser/Listen als die ganze Seite), sonst alles
+    for tag in ("article", "main"):
+        node = tree.find(f".//{tag}")
+        if node is not None:
+            text = _tree_text(node)
+            if len(text) >= 200:
+                return text, dt
+    return _tree_text(tree), dt
 
 def clean_from_html_fragment(fragment: str) -> str:
     if not fragment: return ""
-    soup = BeautifulSoup(fragment, "html.parser")
-    for t in soup(["script","style","noscript"]): t.decompose()
-    text = soup.get_text(" ").strip()
-    return re.sub(r"\s+"," ", text)
+    tree = _html_tree(fragment)
+    if tree is None: return ""
+    etree.strip_elements(tree, *_NOISE_TAGS, with_tail=False)
+    return _tree_text(tree)
 
 def is_eu_url(url: str) -> bool:
     try:
@@ -280,101 +725,134 @@ def is_eu_url(url: str) -> bool:
     except Exception:
         return False
 
+def company_relevance(low: str) -> float:
+    """Anteil der COMPANY_KEYWORDS im (klein geschriebenen) Text, 0..1."""
+    if not COMPANY_KEYWORDS: return 1.0
+    return sum(1 for k in COMPANY_KEYWORDS if k in low) / len(COMPANY_KEYWORDS)
+
 def has_ecom_keywords(text: str) -> bool:
     if not text: return False
     low = text.lower()
     return any(k in low for k in ECOM_KEYWORDS)
 
+_SENT_SPLIT   = re.compile(r"(?<=[.!?])\s+")
+_SIGNAL_TERMS = tuple(dict.fromkeys(COMPANY_KEYWORDS + ECOM_KEYWORDS + [
+    "umsatz","revenue","sales","ebit","gewinn","profit","marge","margin","prognose","guidance",
+    "wachstum","growth","europa","europe","deutschland","germany","%",
+]))
+
+def compress_for_llm(text: str, budget: int) -> str:
+    """Kürzt `text` auf höchstens `budget` Zeichen: statt nur den Anfang zu nehmen, bleiben die Sätze mit den
+    meisten Firmen-/Kennzahl-/E-Commerce-Begriffen (und Zahlen), in ursprünglicher Reihenfolge."""
+    if len(text) <= budget: return text
+    sents = _SENT_SPLIT.split(text)
+    def weight(s):
+        low = s.lower()
+        return sum(1 for k in _SIGNAL_TERMS if k in low) + any(c.isdigit() for c in low)
+    keep, used = [], 0
+    for _, i in sorted(((-weight(s), i) for i, s in enumerate(sents))):  # bei Gleichstand der frühere Satz
+        n = len(sents[i]) + 1
+        if used + n <= budget:
+            keep.append(i); used += n
+    return " ".join(sents[i] for i in sorted(keep)) or text[:budget]
+
 # ============================== Quellen-Finder ================================
+_MEDIA_LINKS = etree.XPath("//a[contains(@href,'/media/')]")  # einmal kompiliert
+
 def discover_from_newsroom(index_url=NEWS_INDEX, max_items=MAX_PER_SOURCE):
     out = []
     try:
-        html_ = fetch(index_url)
-        soup = BeautifulSoup(html_, "html.parser")
-        links = []
-        for a in soup.select("a[href]"):
-            href = (a.get("href") or "").strip()
-            if not href: continue
-            if not href.startswith("http"): href = ul.urljoin(index_url, href)
-            if "/media/" in href:
-                title = a.get_text(strip=True) or "Pernod Ricard – Media"
-                links.append((href, title))
-        seen = set()
-        for href, title in links:
-            if href in seen: continue
-            seen.add(href)
-            out.append({"url": href, "title": title, "source": "newsroom"})
-            if len(out) >= max_items: break
+        tree = _html_tree(fetch(index_url))
+        if tree is None: return out
+        # Links absolut machen und per XPath (in C) vorfiltern, statt jedes <a> in Python anzufassen
+        tree.make_links_absolute(index_url, handle_failures="discard")
+        links = {}  # href -> Titel; erster Treffer gewinnt, Reihenfolge bleibt
+        for a in _MEDIA_LINKS(tree):
+            href = a.get("href").strip()
+            if href not in links:
+                links[href] = " ".join(a.text_content().split()) or "Pernod Ricard – Media"
+                if len(links) >= max_items: break
+        out = [{"url": href, "title": title, "source": "newsroom"} for href, title in links.items()]
     except Exception:
         pass
     return out
 
+def _parse_feed(body: bytes):
+    try:
+        return feedparser.parse(body)
+    except Exception:
+        return None
+
+async def parse_feeds(urls: list[str]) -> list:
+    """Feeds über fetch_many laden (parallel, Rate-Limit, HTTP-Cache/304); feedparser parst nur noch die Bytes,
+    im Thread. Reihenfolge wie `urls`, None bei Fehlern."""
+    if not urls:
+        return []
+    async def parse(url, body):
+        return await asyncio.to_thread(_parse_feed, body)
+    res = await fetch_many(urls, process=parse, raw=True)
+    return [f if isinstance(f, feedparser.FeedParserDict) else None for f in (res.get(u) for u in urls)]
+
+_GNEWS_BASE = "https://news.google.com/rss/search"
+_WHEN_DAYS  = max(1, math.ceil(LOOKBACK_HOURS/24))  # pro Prozess konstant
+
+@lru_cache(maxsize=256)
 def gnews_url(query: str, lang="de", gl="DE", ceid="DE:de", hours=LOOKBACK_HOURS):
-    when_days = max(1, math.ceil(hours/24))
-    base = "https://news.google.com/rss/search"
+    when_days = _WHEN_DAYS if hours == LOOKBACK_HOURS else max(1, math.ceil(hours/24))
     q = f"{query} when:{when_days}d"
-    return base + "?" + ul.urlencode({"q": q, "hl": lang, "gl": gl, "ceid": ceid})
+    return _GNEWS_BASE + "?" + ul.urlencode({"q": q, "hl": lang, "gl": gl, "ceid": ceid})
 
-def discover_from_gnews_queries(company=COMPANY):
+async def discover_from_gnews_queries(company=COMPANY):
     """EU-fokussierte GNews: Firmen-Query + E-Commerce-Queries über EU-Editionen."""
-    out = []
-    # 1) generische Firmenabfrage je EU Edition
+    # 1) generische Firmenabfrage je EU Edition, 2) E-Commerce-Queries je Edition
+    jobs = []
     base_query = f'"{company}"'
     for lang, gl, ceid in EU_GNEWS:
-        url = gnews_url(base_query, lang=lang, gl=gl, ceid=ceid)
-        try:
-            feed = feedparser.parse(url)
-            for e in feed.entries[:MAX_PER_SOURCE]:
-                out.append(_entry_to_item(e, f"gnews:{gl.lower()}:{lang}"))
-        except Exception:
-            pass
-    # 2) E-Commerce-Queries je Edition
+        jobs.append((gnews_url(base_query, lang=lang, gl=gl, ceid=ceid), f"gnews:{gl.lower()}:{lang}"))
     for template in ECOM_QUERIES:
         q = template.format(company=company)
         for lang, gl, ceid in EU_GNEWS:
-            url = gnews_url(q, lang=lang, gl=gl, ceid=ceid)
-            try:
-                feed = feedparser.parse(url)
-                for e in feed.entries[:MAX_PER_SOURCE]:
-                    out.append(_entry_to_item(e, f"gnews-ecom:{gl.lower()}:{lang}"))
-            except Exception:
-                pass
+            jobs.append((gnews_url(q, lang=lang, gl=gl, ceid=ceid), f"gnews-ecom:{gl.lower()}:{lang}"))
+
+    out = []
+    for (_, tag), feed in zip(jobs, await parse_feeds([u for u, _ in jobs])):
+        if feed is None: continue
+        for e in feed.entries[:MAX_PER_SOURCE]:
+            out.append(_entry_to_item(e, tag))
     return out
 
+def entry_datetime(e):
+    """Datum eines Feed-Eintrags; 'updated' hat Vorrang vor 'published' (wie bisher).
+    feedparser liefert *_parsed bereits als UTC-struct_time -> kein dateutil nötig."""
+    dt = None
+    for k in ("published","updated"):
+        parsed = e.get(k + "_parsed")
+        if parsed:
+            dt = datetime(*parsed[:6], tzinfo=timezone.utc)
+        elif k in e:
+            dt = parse_date(e[k]) or dt
+    return dt
+
 def _entry_to_item(e, source_tag):
     link  = e.get("link") or ""
     title = html.unescape(e.get("title", "")).strip() or "News"
-    dt = None
-    for k in ("published","updated"):
-        if k in e:
-            try:
-                dt = dateparser.parse(e[k])
-                if dt and dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
-            except Exception:
-                pass
+    dt = entry_datetime(e)
     return {
         "url": link,
         "title": title,
         "source": source_tag,
-        "published_at": dt.isoformat() if dt else None
+        "published_at": dt  # datetime bleibt datetime; ISO erst beim Schreiben (orjson)
     }
 
-def discover_from_linkedin_rss(max_items=MAX_PER_SOURCE):
+async def discover_from_linkedin_rss(max_items=MAX_PER_SOURCE):
     out = []
-    for feed_url in LINKEDIN_RSS_URLS:
+    for feed in await parse_feeds(LINKEDIN_RSS_URLS):
+        if feed is None: continue
         try:
-            feed = feedparser.parse(feed_url)
             for e in feed.entries[:max_items]:
                 link = e.get("link") or ""
                 title = html.unescape(e.get("title","")).strip() or "LinkedIn"
-                dt = None
-                for k in ("published","updated"):
-                    if k in e:
-                        try:
-                            dt = dateparser.parse(e[k])
-                            if dt and dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
-                        except Exception:
-                            pass
+                dt = entry_datetime(e)
                 content = ""
                 if "summary" in e and e.summary:
                     content = clean_from_html_fragment(e.summary)
@@ -387,92 +865,217 @@ def discover_from_linkedin_rss(max_items=MAX_PER_SOURCE):
                     "url": link,
                     "title": title,
                     "source": "linkedin:rss",
-                    "published_at": dt.isoformat() if dt else None,
+                    "published_at": dt,
                     "prefetched_text": content
                 })
         except Exception:
             pass
     return out
 
-def discover_from_gnews_linkedin(company=COMPANY):
+async def discover_from_gnews_linkedin(company=COMPANY):
     """Best-Effort: site:linkedin.com – EU Editionen."""
+    q = f'"{company}" site:linkedin.com'
+    urls = [gnews_url(q, lang=lang, gl=gl, ceid=ceid) for lang, gl, ceid in EU_GNEWS]
+
     out = []
-    when_days = max(1, math.ceil(LOOKBACK_HOURS/24))
-    for lang, gl, ceid in EU_GNEWS:
-        base = "https://news.google.com/rss/search"
-        q = f'"{company}" site:linkedin.com when:{when_days}d'
-        url = base + "?" + ul.urlencode({"q": q, "hl": lang, "gl": gl, "ceid": ceid})
+    for (lang, gl, _), feed in zip(EU_GNEWS, await parse_feeds(urls)):
+        if feed is None: continue
+        for e in feed.entries[:MAX_PER_SOURCE]:
+            out.append(_entry_to_item(e, f"linkedin:gnews:{gl.lower()}:{lang}"))
+    return out
+
+# =============================== LLM =========================================
+_signal_cache: dict = {}
+_signal_cache_used: set = set()
+
+def load_signal_cache():
+    global _signal_cache
+    try:
+        with open(SIGNAL_CACHE_PATH, "rb") as f:
+            _signal_cache = _loads(f.read())
+    except Exception:
+        _signal_cache = {}
+
+def save_signal_cache():
+    # nur Einträge dieses Laufs behalten -> Datei wächst nicht unbegrenzt
+    try:
+        os.makedirs(os.path.dirname(SIGNAL_CACHE_PATH) or ".", exist_ok=True)
+        write_json(SIGNAL_CACHE_PATH, {k: _signal_cache[k] for k in _signal_cache_used if k in _signal_cache}, indent=False)
+    except Exception:
+        pass
+
+def _sha256_parts(parts) -> str:
+    # Teil für Teil in den Hash statt erst einen großen String zu bauen und komplett zu kodieren
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+def _signal_cache_key(kind: str, company: str, text: str) -> str:
+    return _sha256_parts((kind, OPENAI_MODEL, company, text))
+
+def _cache_get(key: str):
+    # Einträge: {"v": Wert, "t": Unix-Zeit}; abgelaufene/alte Formate zählen als Miss
+    e = _signal_cache.get(key)
+    if isinstance(e, dict) and time.time() - e.get("t", 0) < SIGNAL_CACHE_TTL_DAYS * 86400:
+        _signal_cache_used.add(key)
+        return e.get("v")
+    return None
+
+def _cache_put(key: str, value):
+    if value:
+        _signal_cache[key] = {"v": value, "t": time.time()}
+        _signal_cache_used.add(key)
+
+# Signal-Schema für die Prompts (Batch + Nachforderung je Artikel)
+_SIGNAL_SCHEMA = (
+    "{"
+    "\"type\":\"financial|strategy|markets|risks|product|leadership|sustainability|ecommerce|retail_media\","
+    "\"value\": {"
+    "\"headline\":\"...\",\"metric\":\"...\",\"value\":\"...\",\"unit\":\"...\","
+    "\"topic\":\"...\",\"summary\":\"...\",\"note\":\"...\",\"period\":\"...\",\"region\":\"DE|EU|...\"},"
+    "\"confidence\": 0.0 }"
+)
+
+# System-Prompts als feste Konstanten (nichts Variables darin): byte-gleicher Präfix über alle Aufrufe und Läufe
+# -> OpenAI-Prompt-Caching greift; Firma, Limits und Material stehen nur in der User-Nachricht
+_BATCH_SYSTEM = (
+    "Du extrahierst faktenbasierte, strukturierte Signale zur Firma – mit Fokus auf Europa/Deutschland "
+    "und den E-Commerce-Kanal. Antworte NUR als JSON:\n"
+    "{ \"signals\": [ " + _SIGNAL_SCHEMA + " ] }\n"
+    "Mindestens 4, bis zu 10 Signale."
+)
+_PER_ARTICLE_SYSTEM = (
+    "Extrahiere je Artikel Signale mit Europa/Deutschland- und E-Commerce-Fokus. "
+    "Antworte NUR als JSON:\n"
+    "{ \"per_article\": [ { \"idx\": 0, \"signals\": [ " + _SIGNAL_SCHEMA + " ] } ] }\n"
+    "idx ist die Nummer [n] des Artikels (type kann auch 'ecommerce' oder 'retail_media' sein)."
+)
+_REPORT_SYSTEM = (
+    "Erstelle einen faktenbasierten Bericht (Markdown) zur Firma mit Fokus auf Europa/Deutschland und E-Commerce. "
+    "Struktur (H2):\n"
+    "## Executive Summary\n## Finanzen (Europa/Deutschland)\n## E-Commerce (Europa/Deutschland)\n"
+    "## Retail Media & Marktplätze (Amazon/Zalando …)\n## Strategie\n## Produkte & Innovation\n"
+    "## Führung & Organisation\n## Märkte & Wettbewerb (EU/DE)\n## Nachhaltigkeit & ESG\n## Risiken\n## Ausblick\n\n"
+    "Regeln:\n- Deutsch, 700–1400 Wörter.\n- Nutze Zitatnummern [n] aus der Quellenliste; verwende so viele "
+    "verschiedene Quellen wie in der Anfrage verlangt, sofern sinnvoll.\n"
+    "- Keine PR-Sprache; fokussiere Kennzahlen/Trends für EU/DE und E-Commerce."
+)
+
+# dasselbe Schema als Pydantic-Modelle für Structured Outputs
+class SignalValue(BaseModel):
+    headline: str | None = None
+    metric: str | None = None
+    value: str | None = None
+    unit: str | None = None
+    topic: str | None = None
+    summary: str | None = None
+    note: str | None = None
+    period: str | None = None
+    region: str | None = None
+
+class SignalOut(BaseModel):
+    type: Literal["financial", "strategy", "markets", "risks", "product", "leadership",
+                  "sustainability", "ecommerce", "retail_media"]
+    value: SignalValue
+    confidence: float
+
+class SignalList(BaseModel):
+    signals: list[SignalOut]
+
+class ArticleSignals(BaseModel):
+    idx: int
+    signals: list[SignalOut]
+
+class PerArticleSignals(BaseModel):
+    per_article: list[ArticleSignals]
+
+# Cache-Treffer und JSON-Modus sind nicht validiert -> Typ/Konfidenz weiterhin hier absichern
+def _normalize_signals(raw) -> list[dict]:
+    out = []
+    for s in raw or []:
+        if not isinstance(s, dict):
+            continue
+        s["type"] = str(s.get("type", "summary"))
         try:
-            feed = feedparser.parse(url)
-            for e in feed.entries[:MAX_PER_SOURCE]:
-                out.append(_entry_to_item(e, f"linkedin:gnews:{gl.lower()}:{lang}"))
+            c = float(s.get("confidence", 0.5))
         except Exception:
-            pass
+            c = 0.5
+        s["confidence"] = max(0.0, min(1.0, c))
+        out.append(s)
     return out
 
-# =============================== LLM =========================================
-def llm_batch_signals(company: str, texts: list[dict], limit=SIGNAL_LIMIT) -> list[dict]:
+def _char_budgets(texts: list[dict], total: int) -> list[int]:
+    """Verteilt `total` Zeichen proportional zu `_score`; was kurze Texte nicht brauchen, geht an die übrigen."""
+    weights = [max(float(t.get("_score") or 1.0), 1e-6) for t in texts]
+    lens = [len(t.get("text","")) for t in texts]
+    budgets, open_, remaining = [0] * len(texts), list(range(len(texts))), max(0, total)
+    while open_:
+        w = sum(weights[i] for i in open_)
+        full = [i for i in open_ if lens[i] <= remaining * weights[i] / w]
+        if not full:
+            for i in open_: budgets[i] = int(remaining * weights[i] / w)
+            break
+        for i in full:
+            budgets[i] = lens[i]; remaining -= lens[i]
+        open_ = [i for i in open_ if lens[i] > budgets[i]]
+    return budgets
+
+async def llm_batch_signals(company: str, texts: list[dict], limit=SIGNAL_LIMIT) -> list[dict]:
     if not OPENAI_API_KEY or not texts:
         return []
-    joined = "\n\n".join(
-        f"### {t.get('title','(ohne Titel)')}\n{t.get('text','')[:5000]}"
-        for t in texts
-    )[:22000]
-
-    system = (
-        "Du extrahierst faktenbasierte, strukturierte Signale zur Firma – mit Fokus auf Europa/Deutschland "
-        "und den E-Commerce-Kanal. Antworte NUR als JSON:\n"
-        "{ \"signals\": [ {"
-        "\"type\":\"financial|strategy|markets|risks|product|leadership|sustainability|ecommerce|retail_media\","
-        "\"value\": {"
-        "\"headline\":\"...\",\"metric\":\"...\",\"value\":\"...\",\"unit\":\"...\","
-        "\"topic\":\"...\",\"summary\":\"...\",\"note\":\"...\",\"period\":\"...\",\"region\":\"DE|EU|...\"},"
-        "\"confidence\": 0.0 } ] }\n"
-        "Mindestens 4, bis zu 10 Signale."
-    )
+    heads = [f"### {t.get('title','(ohne Titel)')}\n" for t in texts]
+    budgets = _char_budgets(texts, BATCH_PROMPT_CHARS - sum(len(h) + 2 for h in heads))
+    joined = "\n\n".join(h + compress_for_llm(t.get("text",""), b) for h, t, b in zip(heads, texts, budgets))
+
+    system = _BATCH_SYSTEM
     user = f"Firma: {company}\nQuellenauszüge:\n{joined}"
 
+    # Schlüssel über das komplette Prompt (Modell steckt in _signal_cache_key) -> Prompt-Änderung = neuer Eintrag
+    key = _signal_cache_key("batch", company, system + "\x1f" + user)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached[:limit]
     try:
-        data = llm_json(system, user)
-        out = []
-        for s in data.get("signals", []):
-            if not isinstance(s, dict):
-                continue
-            s["type"] = str(s.get("type", "summary"))
-            try:
-                c = float(s.get("confidence", 0.5))
-            except Exception:
-                c = 0.5
-            s["confidence"] = max(0.0, min(1.0, c))
-            out.append(s)
+        data = await llm_json(system, user, schema=SignalList)
+        out = _normalize_signals(data.get("signals", []))
+        _cache_put(key, out)
         return out[:limit]
     except Exception:
         return []
 
-def llm_per_article(company: str, article: dict) -> list[dict]:
-    if not OPENAI_API_KEY:
+async def llm_per_article_signals(company: str, articles: list[dict],
+                                  per_article: int = FOLLOWUP_SIGNALS_PER_ARTICLE) -> list[dict]:
+    """Nachforderung: ein Request für alle Artikel statt einem pro Artikel. Reihenfolge wie `articles`."""
+    if not OPENAI_API_KEY or not articles:
         return []
-    text = article.get("text", "")[:6000]
-    system = (
-        "Extrahiere bis zu 2 Signale mit Europa/Deutschland- und E-Commerce-Fokus. "
-        "Nur JSON wie zuvor (type kann auch 'ecommerce' oder 'retail_media' sein)."
+    joined = "\n\n".join(
+        f"### [{i}] {a.get('title')}\n{a.get('text','')[:4000]}"
+        for i, a in enumerate(articles)
     )
-    user = f"Firma: {company}\nTitel: {article.get('title')}\nText:\n{text}"
+    system = _PER_ARTICLE_SYSTEM
+    user = f"Firma: {company}\nJe Artikel bis zu {per_article} Signale.\nArtikel:\n{joined}"
 
+    key = _signal_cache_key("per_article", company, system + "\x1f" + user)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        data = llm_json(system, user)
-        out = []
-        for s in data.get("signals", []):
-            if not isinstance(s, dict):
+        data = await llm_json(system, user, schema=PerArticleSignals)
+        by_idx = {}
+        for block in data.get("per_article", []):
+            if not isinstance(block, dict):
                 continue
-            s["type"] = str(s.get("type", "summary"))
             try:
-                c = float(s.get("confidence", 0.5))
+                i = int(block.get("idx"))
             except Exception:
-                c = 0.5
-            s["confidence"] = max(0.0, min(1.0, c))
-            out.append(s)
-        return out[:2]
+                continue
+            if 0 <= i < len(articles) and i not in by_idx:
+                by_idx[i] = _normalize_signals(block.get("signals"))[:per_article]
+        out = [s for i in sorted(by_idx) for s in by_idx[i]]
+        _cache_put(key, out)
+        return out
     except Exception:
         return []
 
@@ -495,21 +1098,19 @@ def heuristic_summary(company: str, texts: list[dict]) -> list[dict]:
         "confidence":0.35,
     }]
 
-def llm_generate_report_markdown(company: str, texts: list[dict], signals: list[dict], sources: list[dict],
-                                 max_texts: int = REPORT_MAX_TEXTS,
-                                 min_citations: int = REPORT_MIN_CITATIONS,
-                                 use_only_selected_sources: bool = True):
+async def llm_generate_report_markdown(company: str, texts: list[dict], signals: list[dict], sources: dict[str, dict],
+                                       max_texts: int = REPORT_MAX_TEXTS,
+                                       min_citations: int = REPORT_MIN_CITATIONS,
+                                       use_only_selected_sources: bool = True):
     if not OPENAI_API_KEY:
         return "", []
     use_texts = texts[:max_texts]
 
     # Auszüge
-    text_snippets = []
-    for t in use_texts:
-        snip = (t.get("text") or "")[:3500]
-        title = t.get("title") or "(ohne Titel)"
-        text_snippets.append(f"# {title}\n{snip}")
-    joined_snippets = "\n\n---\n\n".join(text_snippets)[:24000]
+    joined_snippets = join_budget(
+        (f"# {t.get('title') or '(ohne Titel)'}\n{(t.get('text') or '')[:3500]}" for t in use_texts),
+        "\n\n---\n\n", 24000,
+    )
 
     # kompakte Signalsicht
     sig_lines = []
@@ -521,12 +1122,12 @@ def llm_generate_report_markdown(company: str, texts: list[dict], signals: list[
         )
     signals_digest = "\n".join(sig_lines)
 
-    # Quellenliste (nur die, die ins Prompt gehen)
+    # Quellenliste (nur die, die ins Prompt gehen); `sources` ist nach _nurl geschlüsselt
     if use_only_selected_sources:
-        selected_urls = {t.get("url") for t in use_texts}
-        sources_for_report = [s for s in sources if s.get("url") in selected_urls]
+        selected_urls = {t["_nurl"] for t in use_texts}
+        sources_for_report = [s for n, s in sources.items() if n in selected_urls]
     else:
-        sources_for_report = list(sources)
+        sources_for_report = list(sources.values())
 
     numbered_sources = []
     for i, s in enumerate(sources_for_report, start=1):
@@ -535,78 +1136,193 @@ def llm_generate_report_markdown(company: str, texts: list[dict], signals: list[
         numbered_sources.append(f"[{i}] {ttl+' — ' if ttl else ''}{url}")
     sources_list = "\n".join(numbered_sources)
 
-    system = (
-        "Erstelle einen faktenbasierten Bericht (Markdown) zur Firma mit Fokus auf Europa/Deutschland und E-Commerce. "
-        "Struktur (H2):\n"
-        "## Executive Summary\n## Finanzen (Europa/Deutschland)\n## E-Commerce (Europa/Deutschland)\n"
-        "## Retail Media & Marktplätze (Amazon/Zalando …)\n## Strategie\n## Produkte & Innovation\n"
-        "## Führung & Organisation\n## Märkte & Wettbewerb (EU/DE)\n## Nachhaltigkeit & ESG\n## Risiken\n## Ausblick\n\n"
-        f"Regeln:\n- Deutsch, 700–1400 Wörter.\n- Nutze Zitatnummern [n] aus der Quellenliste; verwende mindestens {min_citations} verschiedene Quellen, sofern sinnvoll.\n"
-        "- Keine PR-Sprache; fokussiere Kennzahlen/Trends für EU/DE und E-Commerce."
-    )
-
+    system = _REPORT_SYSTEM
     user = (
-        f"Firma: {company}\n\n"
+        f"Firma: {company}\n"
+        f"Mindestens {min_citations} verschiedene Quellen zitieren.\n\n"
         f"Signale (kompakt):\n{signals_digest}\n\n"
         f"Material-Auszüge:\n{joined_snippets}\n\n"
         f"Quellenliste (nur diese dürfen zitiert werden):\n{sources_list}\n\n"
         "Erzeuge den Bericht."
     )
 
+    # gleiche Auszüge + Signale + Quellen -> gleicher Bericht, kein erneuter Aufruf
+    key = _signal_cache_key("report", company, system + "\x1f" + user)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached, sources_for_report
     try:
-        md = llm_text(system, user)
-        return md.strip(), sources_for_report
+        md = (await llm_text(system, user)).strip()
+        _cache_put(key, md)
+        return md, sources_for_report
     except Exception:
         return "", sources_for_report
 
 
 # ================================ Pipeline ===================================
-def main():
-    # 1) Links
-    items = []
-    items += discover_from_newsroom()
-    items += discover_from_gnews_queries(COMPANY)
-    if LINKEDIN_RSS_URLS: items += discover_from_linkedin_rss()
-    if INCLUDE_GNEWS_LINKEDIN: items += discover_from_gnews_linkedin(COMPANY)
-    items = dedupe(items, key="url")
-
-    # 2) Inhalte + Datum
-    enriched, sources = [], []
+async def build_signals_and_report(selected: list[dict], sources_by_nurl: dict[str, dict]):
+    """LLM-Signale (Cache nach Inhalts-Hash, nur Misses gehen ans Modell) + Bericht
+    -> (signals, report_md, used_sources, llm_ok); llm_ok nur, wenn kein LLM-Schritt fehlschlug und nichts Fallback ist."""
+    fails_before = _llm_breaker.total_fails
+    signals=[]
+    if OPENAI_API_KEY: load_signal_cache()
+    if OPENAI_API_KEY and selected:
+        signals = await llm_batch_signals(COMPANY, selected, limit=SIGNAL_LIMIT)
+        if len(signals) < 4:
+            signals += await llm_per_article_signals(COMPANY, selected[:FOLLOWUP_ARTICLES])
+        # Dedupe
+        ded={}
+        for s in signals:
+            v=s.get("value",{})
+            key=(v.get("headline","").strip().lower(), v.get("topic","").strip().lower())
+            if key not in ded: ded[key]=s
+        signals=list(ded.values())[:SIGNAL_LIMIT]
+    llm_signals = bool(signals)
+    if not signals:
+        signals = heuristic_summary(COMPANY, selected)
+
+    # Bericht
+    report_md, report_used_sources = "", []
+    try:
+        report_md, report_used_sources = await llm_generate_report_markdown(COMPANY, selected, signals, sources_by_nurl)
+    except Exception:
+        pass
+    if OPENAI_API_KEY: save_signal_cache()
+    llm_ok = llm_signals and bool(report_md) and _llm_breaker.total_fails == fails_before
+    return signals, report_md, report_used_sources, llm_ok
+
+async def signals_and_report(selected: list[dict], sources_by_nurl: dict[str, dict], prev: dict):
+    """Gleiches Material wie im letzten Lauf (gleiche Texte, Modell, Prompts, Einstellungen), dessen LLM-Schritte alle
+    erfolgreich waren und das jünger als SIGNAL_CACHE_TTL_DAYS ist -> Signale und Bericht aus `prev` (letzte
+    latest.json) übernehmen, ganz ohne LLM-Aufruf. -> (signals, report_md, used_sources, Gate-Felder für report_meta)"""
+    input_hash = _sha256_parts(
+        [OPENAI_MODEL, _BATCH_SYSTEM, _PER_ARTICLE_SYSTEM, _REPORT_SYSTEM, COMPANY]
+        + [str(v) for v in (SIGNAL_LIMIT, FOLLOWUP_ARTICLES, FOLLOWUP_SIGNALS_PER_ARTICLE,
+                            REPORT_MAX_TEXTS, REPORT_MIN_CITATIONS, SIGNAL_CACHE_TTL_DAYS)]
+        + [v for a in selected for v in (a["url"], a.get("title",""), a["text"])]
+    )
+    prev_meta = prev.get("report_meta") or {}
+    llm_at, prev_at = now_utc(), parse_date(prev_meta.get("llm_generated_at"))
+    if (OPENAI_API_KEY and selected and prev.get("report_markdown") and prev_at
+            and prev_meta.get("input_hash") == input_hash
+            and llm_at - prev_at < timedelta(days=SIGNAL_CACHE_TTL_DAYS)):
+        gate = {"input_hash": input_hash, "llm_generated_at": prev_meta["llm_generated_at"]}  # Alter bleibt -> TTL läuft ab
+        return prev.get("signals") or [], prev["report_markdown"], prev.get("report_used_sources") or [], gate
+    signals, report_md, report_used_sources, llm_ok = await build_signals_and_report(selected, sources_by_nurl)
+    # Fallback-Signale oder fehlgeschlagene Schritte nicht festschreiben -> nächster Lauf fragt das LLM erneut
+    gate = {"input_hash": input_hash, "llm_generated_at": llm_at.strftime("%Y-%m-%dT%H:%M:%SZ")} if llm_ok else {}
+    return signals, report_md, report_used_sources, gate
+
+def load_previous_output(path: str) -> dict:
+    try:
+        with open(path, "rb") as f:
+            prev = _loads(f.read())
+        return prev if isinstance(prev, dict) else {}
+    except Exception:
+        return {}
+
+async def main():
+    try:
+        await _main()
+    finally:
+        # auch bei Fehlern/Abbruch: beim Schließen wird das WAL in die .sqlite-Datei geschrieben,
+        # sonst fehlen diese Seiten im Actions-Cache (der nur die .sqlite-Datei sichert)
+        close_http_cache()
+
+async def _main():
+    # 1) Links + 2) Inhalte/Datum als Pipeline: jede Quelle startet ihre Artikel-Downloads, sobald ihre Links da sind,
+    #    statt auf die langsamste Quelle zu warten; jede Seite wird geparst, sobald sie geladen ist
+    def min_chars(src, url):
+        return MIN_TEXT_CHARS_LINKEDIN if src.startswith("linkedin") or "linkedin.com" in url else MIN_TEXT_CHARS_ARTICLE
+
+    def parse_page(url, html_):
+        # CPU-Teil (lxml/Readability) im Thread -> die Event-Loop lädt währenddessen weiter;
+        # unveränderte Seiten (304 / gleicher Body) nehmen das Ergebnis des letzten Laufs
+        if len(html_) > MAX_PARSE_BYTES:
+            log.warning("%s hat %d Zeichen HTML, geparst werden nur %d.", url, len(html_), MAX_PARSE_BYTES)
+            html_ = html_[:MAX_PARSE_BYTES]
+        h = parsed_cache_key(html_)
+        hit = parsed_cache_get(url, h)
+        if hit is not None: return hit
+        try:
+            text, dt = parse_article(html_)
+        except Exception:
+            text, dt = "", None
+        parsed_cache_put(url, h, text, dt)
+        return text, dt
+
+    loop, good = asyncio.get_running_loop(), 0
+    to_fetch, fetches = {}, []  # normalisierte URL -> Item (je URL nur ein Download) | laufende fetch_many-Tasks
+    res_items = {}              # Roh-URL -> Item (für on_page)
+    with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as parse_pool:
+        async def parse(url, html_):
+            if not html_: return "", None
+            return await loop.run_in_executor(parse_pool, parse_page, url, html_)
+        def on_page(url, res):
+            nonlocal good
+            if isinstance(res, tuple) and len(res[0]) >= min_chars(res_items[url].get("source",""), url): good += 1
+            return FETCH_STOP_AFTER > 0 and good >= FETCH_STOP_AFTER
+        async def discover(job):
+            found = await job
+            new = []
+            for it in found:
+                u = it.get("url")
+                if not u or it.get("prefetched_text"): continue
+                n = norm_url(u).lower()
+                if n in to_fetch: continue
+                to_fetch[n] = res_items[u] = it
+                new.append(u)
+            if new and not (FETCH_STOP_AFTER > 0 and good >= FETCH_STOP_AFTER):
+                fetches.append(asyncio.create_task(fetch_many(new, process=parse, stop=on_page)))
+            return found
+
+        # alle Quellen gleichzeitig; Newsroom (sync requests + lxml) im Thread, damit die Feeds weiterladen
+        jobs = [asyncio.to_thread(discover_from_newsroom), discover_from_gnews_queries(COMPANY)]
+        if LINKEDIN_RSS_URLS: jobs.append(discover_from_linkedin_rss())
+        if INCLUDE_GNEWS_LINKEDIN: jobs.append(discover_from_gnews_linkedin(COMPANY))
+        found = await asyncio.gather(*(discover(j) for j in jobs))
+        items = dedupe([it for f in found for it in f], key="url")  # Reihenfolge wie bisher, erster Treffer gewinnt
+
+        # Ergebnisse nach normalisierter URL: Duplikate mit anderer Roh-URL teilen sich den einen Download
+        parsed = {}
+        for res in await asyncio.gather(*fetches):
+            for u, r in res.items(): parsed[norm_url(u).lower()] = r
+
+    for it in items:
+        it["_dt"] = parse_date(it.get("published_at"))  # Feeds liefern schon datetime -> kein Parsen
+
+    enriched, sources_by_nurl = [], {}
     for it in items:
         url, title, src = it["url"], it.get("title",""), it.get("source","")
         prefetched = it.get("prefetched_text","")
 
-        html_ = None
         if prefetched:
-            text = prefetched
+            text, page_dt = prefetched, None
         else:
-            try:
-                html_ = fetch(url)
-                text = clean_article_text(html_)
-            except Exception:
-                text = ""
-
-        dt = it.get("published_at")
-        if dt:
-            try: dt = dateparser.parse(dt)
-            except: dt = None
-        if not isinstance(dt, datetime) and html_:
-            dt = extract_published_at(html_)
+            res = parsed.get(it["_nurl"])
+            text, page_dt = res if isinstance(res, tuple) else ("", None)
+        dt = it["_dt"] or page_dt  # Feed-Datum hat Vorrang
 
-        min_chars = MIN_TEXT_CHARS_LINKEDIN if src.startswith("linkedin") or "linkedin.com" in url else MIN_TEXT_CHARS_ARTICLE
-        if len(text) >= min_chars:
+        if len(text) >= min_chars(src, url):
             enriched.append({
-                "url": url, "title": title, "source": src,
+                "url": url, "_nurl": it["_nurl"], "title": title, "source": src,
                 "published_at": dt, "text": text
             })
 
-        sources.append({"url": url, "title": title, "source": src})
+        sources_by_nurl[it["_nurl"]] = {"url": url, "title": title, "source": src}
 
-    # 3) Lookback
+    # 3) Lookback + Boilerplate-Filter (kaum verschiedene Wörter -> Menüs, Cookie-Banner, Listen)
+    #    + Firmenbezug (ohne Keyword-Treffer kein Platz im LLM-Budget)
+    now=now_utc()
+    cutoff=now-timedelta(hours=LOOKBACK_HOURS)  # einmal statt je Item
     enriched_recent=[]
     for a in enriched:
         dt=a.get("published_at")
-        if dt and not is_recent(dt, LOOKBACK_HOURS): continue
+        if dt and dt < cutoff: continue
+        words=a["text"].split()
+        if len(set(words)) < MIN_UNIQUE_RATIO * len(words): continue
+        a["_rel"]=company_relevance(f'{a.get("title","")} {a["text"]}'.lower())
+        if a["_rel"] == 0 and a.get("source") not in ("newsroom", "linkedin:rss"): continue  # eigene Kanäle immer relevant
         enriched_recent.append(a)
 
     # 4) Scoring: EU/DE & E-Commerce bevorzugen
@@ -615,43 +1331,24 @@ def main():
         dt=a.get("published_at")
         fresh_bonus=0.0
         if dt:
-            hours=max(1.0,(now_utc()-dt).total_seconds()/3600.0)
+            hours=max(1.0,(now-dt).total_seconds()/3600.0)
             fresh_bonus=1.0/hours
         url=a.get("url","")
         eu_bonus=0.5 if is_eu_url(url) else 0.0
         ecom_bonus=0.4 if (has_ecom_keywords(a.get("title","")) or has_ecom_keywords(a.get("text",""))) else 0.0
         li_bonus=0.2 if ("linkedin" in a.get("source","")) else 0.0
-        return L/1500.0 + fresh_bonus + eu_bonus + ecom_bonus + li_bonus
+        return L/1500.0 + fresh_bonus + eu_bonus + ecom_bonus + li_bonus + a["_rel"]
 
-    enriched_recent.sort(key=score, reverse=True)
-    selected=enriched_recent[:TOP_TEXTS]
+    for a in enriched_recent: a["_score"]=score(a)
+    enriched_recent.sort(key=lambda a: a["_score"], reverse=True)
+    selected=dedupe_by_text(enriched_recent)[:TOP_TEXTS]  # Mehrfachkopien kosten sonst doppelt Tokens
 
-    # 5) LLM-Signale
-    signals=[]
-    if OPENAI_API_KEY and selected:
-        signals = llm_batch_signals(COMPANY, selected, limit=SIGNAL_LIMIT)
-        if len(signals) < 4:
-            for art in selected[:min(6,len(selected))]:
-                signals += llm_per_article(COMPANY, art)
-                if len(signals) >= SIGNAL_LIMIT: break
-        # Dedupe
-        ded={}
-        for s in signals:
-            v=s.get("value",{})
-            key=(v.get("headline","").strip().lower(), v.get("topic","").strip().lower())
-            if key not in ded: ded[key]=s
-        signals=list(ded.values())[:SIGNAL_LIMIT]
-    if not signals:
-        signals = heuristic_summary(COMPANY, selected)
-
-    # 6) Bericht
-    report_md, report_used_sources = "", []
-    try:
-        report_md, report_used_sources = llm_generate_report_markdown(COMPANY, selected, signals, sources)
-    except Exception:
-        pass
+    # 5)+6) Signale + Bericht (oder unverändert aus dem letzten Lauf, siehe signals_and_report)
+    signals, report_md, report_used_sources, gate = await signals_and_report(
+        selected, sources_by_nurl, load_previous_output("data/latest.json"))
 
     # 7) Schreiben
+    sources = list(sources_by_nurl.values())
     os.makedirs("data", exist_ok=True)
     out = {
         "company": COMPANY,
@@ -666,14 +1363,14 @@ def main():
             "top_texts": TOP_TEXTS,
             "signal_limit": SIGNAL_LIMIT,
             "eu_bias": True,
-            "ecommerce_bias": True
+            "ecommerce_bias": True,
+            **gate,  # input_hash + llm_generated_at für den nächsten Lauf, nur wenn alle LLM-Schritte durchliefen
         }
     }
-    with open("data/latest.json", "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    write_json("data/latest.json", out)
 
     eu_count = sum(1 for s in sources if is_eu_url(s.get("url","")))
     print(f"Wrote data/latest.json with {len(signals)} signals; sources={len(sources)} (EU={eu_count}); selected={len(selected)}.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -2,7 +2,7 @@
 import asyncio
 from scraper import fetch_url, hash_text
 from extractor import call_llm_extract
-from db import engine
+from db import get_engine
 from sqlalchemy import text
 
 # minimal orchestrator: seed a few Pernod URLs and run
@@ -12,6 +12,7 @@ SEED_URLS = [
 ]
 
 async def main():
+    engine = get_engine()
     for u in SEED_URLS:
         try:
             doc = await fetch_url(u)
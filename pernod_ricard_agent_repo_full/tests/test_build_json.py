@@ -0,0 +1,132 @@
+# test_build_json.py
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from scripts.build_json import (
+    CircuitBreaker, RateLimiter, _char_budgets, compress_for_llm, dedupe, dedupe_by_text,
+    entry_datetime, join_budget, parse_date,
+)
+
+def test_dedupe_first_wins():
+    items = [
+        {"url": "https://example.com/a?b=2&a=1", "source": "gnews"},
+        {"url": "https://example.com/b", "source": "gnews"},
+        {"url": "https://EXAMPLE.com/a/?a=1&b=2", "source": "newsroom"},
+        {"url": "", "source": "leer"},
+    ]
+    out = dedupe(items)
+    assert len(out) == 2
+    assert [it["source"] for it in out] == ["gnews", "gnews"]
+    assert all(it["_nurl"] for it in out)
+
+def test_dedupe_by_text_keeps_first_copy():
+    items = [
+        {"url": "https://a.example/x", "text": "Pernod Ricard steigert den Umsatz."},
+        {"url": "https://b.example/y", "text": "pernod ricard  steigert den Umsatz"},
+        {"url": "https://c.example/z", "text": "Pernod Ricard senkt die Prognose."},
+    ]
+    out = dedupe_by_text(items)
+    assert [it["url"] for it in out] == ["https://a.example/x", "https://c.example/z"]
+
+def test_compress_for_llm_keeps_relevant_sentences():
+    text = "Das Wetter war schön. Pernod Ricard steigert den Umsatz um 5 %. Die Kantine hat neue Stühle."
+    assert compress_for_llm(text, len(text)) == text
+    assert compress_for_llm(text, 45) == "Pernod Ricard steigert den Umsatz um 5 %."
+    assert len(compress_for_llm("x" * 50, 10)) == 10
+
+def test_failed_llm_step_is_not_reused_next_run(monkeypatch, tmp_path):
+    import scripts.build_json as bj
+
+    calls = {"json": 0}
+    async def fake_json(system, user, schema=None):
+        calls["json"] += 1
+        if calls["json"] == 1:
+            raise RuntimeError("Timeout")
+        return {"signals": [{"type": "financial", "value": {"headline": "Umsatz steigt"}, "confidence": 0.7}]}
+    async def fake_text(system, user):
+        return "## Executive Summary\nUmsatz steigt [1]"
+
+    monkeypatch.setattr(bj, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(bj, "SIGNAL_CACHE_PATH", str(tmp_path / "signal_cache.json"))
+    monkeypatch.setattr(bj, "_signal_cache", {})
+    monkeypatch.setattr(bj, "_llm_breaker", bj.CircuitBreaker(5, 60))
+    monkeypatch.setattr(bj, "_llm_json_call", fake_json)
+    monkeypatch.setattr(bj, "_llm_text_call", fake_text)
+    monkeypatch.setattr(bj, "FOLLOWUP_ARTICLES", 0)
+
+    selected = [{"url": "https://a.example/x", "_nurl": "https://a.example/x",
+                 "title": "Pernod Ricard", "text": "Pernod Ricard steigert den Umsatz."}]
+    sources = {"https://a.example/x": {"title": "Pernod Ricard", "url": "https://a.example/x"}}
+
+    # Lauf 1: Signal-Aufruf scheitert -> Fallback-Signale, kein Gate für den nächsten Lauf
+    signals, report_md, _, gate = asyncio.run(bj.signals_and_report(selected, sources, {}))
+    assert signals and report_md and gate == {}
+    prev = {"signals": signals, "report_markdown": report_md, "report_meta": gate}
+
+    # Lauf 2: gleiches Material -> LLM wird erneut gefragt
+    signals, _, _, gate = asyncio.run(bj.signals_and_report(selected, sources, prev))
+    assert calls["json"] == 2
+    assert signals[0]["value"]["headline"] == "Umsatz steigt"
+    assert gate["input_hash"] and gate["llm_generated_at"]
+
+    # Lauf 3: alles lief durch -> Ergebnis aus dem Vorlauf, kein LLM-Aufruf
+    prev = {"signals": signals, "report_markdown": "alt", "report_meta": gate}
+    _, report_md, _, _ = asyncio.run(bj.signals_and_report(selected, sources, prev))
+    assert report_md == "alt" and calls["json"] == 2
+
+def test_circuit_breaker_opens_and_half_opens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("scripts.build_json.time.monotonic", lambda: now[0])
+    br, calls = CircuitBreaker(fail_max=2, reset_timeout=30), []
+    async def boom():
+        calls.append(1); raise ValueError("down")
+    async def ok():
+        calls.append(1); return "ok"
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            asyncio.run(br.call(boom))
+    # offen: sofortiger Fehler, Funktion wird nicht aufgerufen
+    with pytest.raises(RuntimeError):
+        asyncio.run(br.call(ok))
+    assert len(calls) == 2
+    # nach reset_timeout halb offen: ein Versuch geht durch, Erfolg schließt wieder
+    now[0] += 31
+    assert asyncio.run(br.call(ok)) == "ok"
+    assert br.fails == 0 and len(calls) == 3
+
+def test_rate_limiter_caps_request_at_capacity():
+    lim = RateLimiter(rate=1, capacity=2)
+    # mehr als der Bucket fasst -> wird auf capacity gekappt statt ewig zu warten
+    asyncio.run(asyncio.wait_for(lim.acquire(100), timeout=1))
+    assert lim.tokens < 1
+
+def test_char_budgets_respect_total_and_redistribute():
+    texts = [{"text": "x" * 50, "_score": 1}, {"text": "y" * 5000, "_score": 1}, {"text": "z" * 5000, "_score": 2}]
+    budgets = _char_budgets(texts, 3000)
+    assert sum(budgets) <= 3000
+    assert budgets[0] == 50  # kurzer Text bekommt nur, was er braucht
+    assert budgets[1] == int(2950 / 3) and budgets[2] == int(2950 * 2 / 3)  # Rest anteilig nach Score
+    assert _char_budgets(texts, 100000) == [50, 5000, 5000]
+
+@pytest.mark.parametrize("limit", [0, 3, 7, 12, 100])
+def test_join_budget_matches_join_and_slice(limit):
+    parts = ["abc", "de", "", "fghij"]
+    assert join_budget(iter(parts), " | ", limit) == " | ".join(parts)[:limit]
+
+def test_parse_date_formats():
+    utc = timezone.utc
+    assert parse_date("2024-05-01T10:00:00Z") == datetime(2024, 5, 1, 10, tzinfo=utc)
+    assert parse_date("Wed, 01 May 2024 12:00:00 +0200") == datetime(2024, 5, 1, 10, tzinfo=utc)
+    assert parse_date("2024-05-01 10:00") == datetime(2024, 5, 1, 10, tzinfo=utc)  # naiv -> UTC
+    assert parse_date(datetime(2024, 5, 1, 10)).tzinfo == utc
+    assert parse_date("") is None and parse_date("kein Datum") is None
+
+def test_entry_datetime_prefers_updated():
+    e = {"published_parsed": (2024, 5, 1, 8, 0, 0, 0, 0, 0), "updated_parsed": (2024, 5, 2, 9, 0, 0, 0, 0, 0)}
+    assert entry_datetime(e) == datetime(2024, 5, 2, 9, tzinfo=timezone.utc)
+    assert entry_datetime({"published": "2024-05-01T08:00:00Z", "updated": "Thu, 02 May 2024 09:00:00 GMT"}) \
+        == datetime(2024, 5, 2, 9, tzinfo=timezone.utc)
+    assert entry_datetime({"published": "2024-05-01T08:00:00Z"}) == datetime(2024, 5, 1, 8, tzinfo=timezone.utc)